@@ -18,13 +18,39 @@ GeneXus生成JavaコードからSQL/テーブル参照を抽出し、
 
 import argparse
 import json
+import os
 import re
 import sys
 import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Any, Set, Tuple, Optional
+from typing import Dict, FrozenSet, Iterator, List, Any, Set, Tuple, Optional
 from dataclasses import dataclass, field, asdict
-from collections import defaultdict, deque
+from collections import Counter, defaultdict
+
+# Optional deps
+try:
+    import re2  # type: ignore  # google-re2（DFA ベース。インストール時のみ使用）
+except Exception:
+    re2 = None
+
+try:
+    import ijson  # type: ignore  # 大きな java_structure.json のストリーム読み込み用
+except Exception:
+    ijson = None
+
+try:
+    import ahocorasick  # type: ignore  # pyahocorasick（クラス名キーワードの一括照合用）
+except Exception:
+    ahocorasick = None
+
+try:
+    import orjson  # type: ignore  # 高速な JSON 読み書き（未インストールなら標準 json）
+except Exception:
+    orjson = None
 
 
 # ---------- 呼び出し関係（コールグラフ） ----------
@@ -39,6 +65,11 @@ _IGNORE_METHOD_NAMES = {
 }
 
 
+_NEW_EXPR_RE = re.compile(r"\bnew\s+([A-Za-z_][A-Za-z0-9_]*)\b")
+_NON_IDENT_CHAR_RE = re.compile(r"[^A-Za-z0-9_]")
+
+
+@lru_cache(maxsize=8192)
 def _simplify_qualifier(text: Optional[str]) -> Optional[str]:
     """Best-effort simplification for a call qualifier.
 
@@ -56,7 +87,7 @@ def _simplify_qualifier(text: Optional[str]) -> Optional[str]:
         return None
 
     # "new Type(...)" -> Type
-    m = re.search(r"\bnew\s+([A-Za-z_][A-Za-z0-9_]*)\b", q)
+    m = _NEW_EXPR_RE.search(q)
     if m:
         return m.group(1)
 
@@ -66,7 +97,7 @@ def _simplify_qualifier(text: Optional[str]) -> Optional[str]:
     if '.' in q:
         q = q.rsplit('.', 1)[-1].strip()
     # Keep only identifier-like token
-    q = re.sub(r"[^A-Za-z0-9_]", "", q)
+    q = _NON_IDENT_CHAR_RE.sub("", q)
     return q or None
 
 
@@ -84,12 +115,34 @@ def _tokenize_identifiers(text: str) -> Set[str]:
     """
     if not text:
         return set()
-    return {m.group(0).lower() for m in _IDENT_RE.finditer(text)}
+    return {ident.lower() for ident in _IDENT_RE.findall(text)}
+
+
+def _method_analysis_text(method: Dict[str, Any]) -> str:
+    """Build analysis text: excerpt/signature + extracted SQL literals (single join)."""
+    parts = [method.get('code') or method.get('signature') or '']
+    parts.extend(method.get('sql_strings') or [])
+    return "\n".join(parts)
+
+
+def _prepare_columns(columns: List[Dict[str, Any]]) -> Dict[str, List[Tuple[int, str, Optional[str]]]]:
+    """Pre-process table columns for `_extract_used_columns`.
+
+    Returns an inverted index {lowered_name: [(position, name, logical_name), ...]};
+    names of 2 chars or less are dropped since they are too noisy to match against identifiers.
+    """
+    by_lower: Dict[str, List[Tuple[int, str, Optional[str]]]] = {}
+    for pos, col in enumerate(columns):
+        name = (col.get('name') or '').strip()
+        if len(name) <= 2:
+            continue
+        by_lower.setdefault(name.lower(), []).append((pos, name, col.get('logical_name')))
+    return by_lower
 
 
 def _extract_used_columns(
     text: str,
-    columns: List[Dict[str, Any]],
+    columns: Dict[str, List[Tuple[int, str, Optional[str]]]],
     max_cols: int = 25,
     tokens: Optional[Set[str]] = None,
 ) -> List[Dict[str, Any]]:
@@ -97,42 +150,48 @@ def _extract_used_columns(
 
     Heuristic (static analysis): over/under-approximation is possible.
     Optimized for large projects by using identifier token sets.
+    `columns` is the inverted index built by `_prepare_columns`; matches are
+    found by set intersection and returned in table column order.
     """
-    used: List[Dict[str, Any]] = []
     if not text or not columns:
-        return used
+        return []
     if tokens is None:
         tokens = _tokenize_identifiers(text)
     if not tokens:
-        return used
+        return []
 
-    for col in columns:
-        name = (col.get('name') or '').strip()
-        if not name:
-            continue
-        if len(name) <= 2:
-            continue
-        if name.lower() in tokens:
-            used.append({'name': name, 'logical_name': col.get('logical_name')})
-            if len(used) >= max_cols:
-                break
-    return used
+    hits = tokens & columns.keys()
+    if not hits:
+        return []
+    matched = sorted(entry for key in hits for entry in columns[key])
+    return [
+        {'name': name, 'logical_name': logical_name}
+        for _, name, logical_name in matched[:max_cols]
+    ]
 
 
 # ---------- データ構造 ----------
+# NOTE: 参照数・機能数が多い大規模プロジェクト向けに slots=True（インスタンス毎の __dict__ を持たない）
 
-@dataclass
+@dataclass(slots=True)
 class TableReference:
     """テーブル参照情報"""
     table_name: str                    # テーブル物理名
+    table_key: str                     # 大文字のテーブル物理名（集計キー。sys.intern 済み）
     logical_name: str                  # テーブル論理名（日本語）
     operation_type: str                # SELECT/INSERT/UPDATE/DELETE
     source_class: str                  # 参照元クラス
     source_method: Optional[str]       # 参照元メソッド
-    context: str                       # 参照コンテキスト（コード断片）
+    source_text: str = field(repr=False)  # 参照元コード（メソッドテキストを共有し、コピーしない）
+    context_pos: int = field(repr=False)  # source_text 内の一致位置
+
+    @property
+    def context(self) -> str:
+        """参照コンテキスト（コード断片）。参照毎に保持せず、必要な時だけ切り出す"""
+        return _reference_context(self.source_text, self.context_pos)
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionDesign:
     """機能設計情報"""
     function_name: str                 # 機能名（日本語）
@@ -145,15 +204,15 @@ class FunctionDesign:
     # - related_classes は既存互換のため残す（最終的に function_id の配列を入れる）
     # - raw のクラス名（コールグラフ由来）は related_class_names に保持する
     related_classes: List[str]                              # 互換用: 関連機能ID一覧
+    tables_used: List[Dict[str, Any]]  # 使用テーブル一覧
+    crud_matrix: Dict[str, List[str]]  # CRUD操作マトリックス
     related_class_names: List[str] = field(default_factory=list)        # raw: 関連クラス名一覧
     related_functions_callgraph: List[str] = field(default_factory=list) # callgraph: 関連機能ID一覧
     related_functions_prefix: List[str] = field(default_factory=list)    # prefix: 関連機能ID一覧
     related_functions: List[str] = field(default_factory=list)           # union(callgraph,prefix)
-    tables_used: List[Dict[str, Any]]  # 使用テーブル一覧
-    crud_matrix: Dict[str, List[str]]  # CRUD操作マトリックス
 
 
-@dataclass
+@dataclass(slots=True)
 class SystemDesign:
     """システム設計情報"""
     project_name: str
@@ -164,81 +223,191 @@ class SystemDesign:
 
 # ---------- SQL/テーブル参照抽出 ----------
 
+def _reference_context(code: str, position: int, context_length: int = 100) -> str:
+    """参照箇所の前後コンテキストを抽出（改行は空白に置換）"""
+    start = max(0, position - context_length // 2)
+    end = min(len(code), position + context_length // 2)
+    return code[start:end].replace('\n', ' ').strip()
+
+
+# テーブル名として扱わない予約語や一般的な語（大文字で保持）
+_SQL_RESERVED_WORDS = frozenset({
+    'SELECT', 'FROM', 'WHERE', 'AND', 'OR', 'SET', 'INTO',
+    'VALUES', 'ORDER', 'GROUP', 'HAVING', 'LIMIT', 'OFFSET',
+    'NULL', 'TRUE', 'FALSE', 'AS', 'ON', 'IN', 'NOT', 'LIKE',
+})
+
+# GeneXusエンティティ名の接頭辞（sdt_/type_/bc_/trn_）
+_ENTITY_PREFIX_RE = re.compile(r'(?:sdt|type|bc|trn)_', re.IGNORECASE)
+
+
+class _FusedPatterns:
+    """複数の正規表現を 1 回の走査で評価する結合パターン.
+
+    全パターンを 1 つの先読み ``(?=(?:(?P<a>...)|(?P<b>...)|...))`` にまとめて finditer し、
+    一致したパターン（lastindex）で振り分ける。先読みなので一致箇所を消費せず、
+    「DELETE FROM t」の FROM のように別位置から始まる重複一致も検出できる。
+    同一位置で後続パターンも一致しうる場合（例: sdt_x_bc.load の BC と SDT）は、
+    一致位置でのみ後続パターンを個別に match して補う。
+
+    パターン毎に直前に採用した一致の終端より前から始まる一致は捨てるので、
+    結果は各パターンを個別に re.finditer した場合と同じになる
+    （例: 「UPDATE UPDATE t」の 2 つ目の UPDATE や sdt_sdt_x の 2 つ目の sdt_ は拾わない）。
+    パターンは IGNORECASE でコンパイルする。
+    guard には全パターンの一致開始位置が必ず満たす条件（例: ``\\b(?=[fj])``）を指定でき、
+    先読みの評価を候補位置に絞る（結果は変わらない）。
+
+    re2 がインストールされている場合は、ASCII のみのテキストに限りパターンごとに re2 で走査する
+    （RE2 は先読みを扱えないため結合はしない）。RE2 の \\w / \\b / 大文字小文字の畳み込みは
+    ASCII のみで re（Unicode）と結果が変わりうるため、非 ASCII テキストは常に re で走査する。
+    """
+
+    __slots__ = ('names', 'fused', '_alternatives', '_by_lastindex', '_re2_patterns')
+
+    def __init__(self, named_patterns: List[Tuple[str, str]], guard: str = ''):
+        self.names = [name for name, _ in named_patterns]
+        self.fused = re.compile(
+            guard + '(?=(?:' + '|'.join(f"(?P<{name}>{pattern})" for name, pattern in named_patterns) + '))',
+            re.IGNORECASE,
+        )
+        # (結合パターン内でのパターン全体のグループ番号, キャプチャグループ数, 個別コンパイル済みパターン)
+        self._alternatives: List[Tuple[int, int, re.Pattern]] = []
+        for name, pattern in named_patterns:
+            single = re.compile(pattern, re.IGNORECASE)
+            self._alternatives.append((self.fused.groupindex[name], single.groups, single))
+        self._by_lastindex = {self.fused.groupindex[name]: k for k, name in enumerate(self.names)}
+        self._re2_patterns = None
+        if re2 is not None:
+            try:
+                self._re2_patterns = [re2.compile('(?i)' + pattern) for _, pattern in named_patterns]
+            except Exception:
+                self._re2_patterns = None
+
+    def scan(self, code: str) -> Iterator[Tuple[int, Tuple[str, ...], int]]:
+        """(パターン番号, キャプチャグループの文字列のタプル, 一致開始位置) を列挙する
+
+        re 使用時は出現位置順、re2 使用時はパターン順に列挙する（パターン毎には常に出現位置順）。
+        """
+        if self._re2_patterns is not None and code.isascii():
+            for k, pattern in enumerate(self._re2_patterns):
+                for m in pattern.finditer(code):
+                    yield k, m.groups(), m.start()
+            return
+        alternatives = self._alternatives
+        count = len(alternatives)
+        ends = [0] * count  # パターン毎の直前の採用一致の終端（個別 finditer の再開位置）
+        for m in self.fused.finditer(code):
+            pos = m.start()
+            k = self._by_lastindex[m.lastindex]
+            base, ngroups, _ = alternatives[k]
+            if pos >= ends[k]:
+                ends[k] = m.end(base)
+                yield k, m.groups()[base:base + ngroups], pos
+            for j in range(k + 1, count):
+                if pos < ends[j]:
+                    continue
+                m2 = alternatives[j][2].match(code, pos)
+                if m2:
+                    ends[j] = m2.end()
+                    yield j, m2.groups(), pos
+
+
 class TableReferenceExtractor:
     """コードからテーブル参照を抽出"""
     
-    # SQL文パターン
+    # SQL文パターン（大文字小文字は区別しない: _SQL_RE で IGNORECASE 指定）
     SQL_PATTERNS = {
         'SELECT': [
-            r'(?i)\bFROM\s+([A-Za-z_][A-Za-z0-9_]*)',
-            r'(?i)\bJOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
-            r'(?i)\bINNER\s+JOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
-            r'(?i)\bLEFT\s+JOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
-            r'(?i)\bRIGHT\s+JOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bFROM\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bJOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bINNER\s+JOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bLEFT\s+JOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bRIGHT\s+JOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
         ],
         'INSERT': [
-            r'(?i)\bINSERT\s+INTO\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bINSERT\s+INTO\s+([A-Za-z_][A-Za-z0-9_]*)',
         ],
         'UPDATE': [
-            r'(?i)\bUPDATE\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bUPDATE\s+([A-Za-z_][A-Za-z0-9_]*)',
         ],
         'DELETE': [
-            r'(?i)\bDELETE\s+FROM\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bDELETE\s+FROM\s+([A-Za-z_][A-Za-z0-9_]*)',
         ],
     }
     
-    # GeneXus特有のパターン
+    # GeneXus特有のパターン（大文字小文字は区別しない: _GX_RE で IGNORECASE 指定）
     GENEXUS_PATTERNS = {
         # Business Componentによるテーブルアクセス
-        'BC_LOAD': r'(?i)(\w+)_bc\s*[.]\s*load',
-        'BC_SAVE': r'(?i)(\w+)_bc\s*[.]\s*save',
-        'BC_DELETE': r'(?i)(\w+)_bc\s*[.]\s*delete',
+        'BC_LOAD': r'(\w+)_bc\s*[.]\s*load',
+        'BC_SAVE': r'(\w+)_bc\s*[.]\s*save',
+        'BC_DELETE': r'(\w+)_bc\s*[.]\s*delete',
         # GeneXusのFor Each
-        'FOR_EACH': r'(?i)for\s+each\s+(\w+)',
+        'FOR_EACH': r'for\s+each\s+(\w+)',
         # SDT参照
-        'SDT_REF': r'(?i)sdt_(\w+)',
+        'SDT_REF': r'sdt_(\w+)',
     }
+
+    # GeneXusパターン → 操作種別
+    GENEXUS_OPERATIONS = {
+        'BC_LOAD': 'SELECT',
+        'BC_SAVE': 'INSERT/UPDATE',
+        'BC_DELETE': 'DELETE',
+        'FOR_EACH': 'SELECT',
+        'SDT_REF': 'REFERENCE',
+    }
+
+    # 全パターンを結合した単一パターン（クラス定義時に 1 回だけコンパイル）
+    _SQL_RE = _FusedPatterns([
+        (f"{op_type}_{i}", pattern)
+        for op_type, patterns in SQL_PATTERNS.items()
+        for i, pattern in enumerate(patterns)
+    ], guard=r'\b(?=[fijlrud])')  # 全 SQL パターンは \b + FROM/JOIN/INNER/LEFT/RIGHT/INSERT/UPDATE/DELETE で始まる
+    # パターン番号 → 操作種別
+    _SQL_OPS = [op_type for op_type, patterns in SQL_PATTERNS.items() for _ in patterns]
+    _GX_RE = _FusedPatterns(list(GENEXUS_PATTERNS.items()), guard=r'(?=\w)')  # 全パターンは単語文字から始まる
     
     def __init__(self, db_metadata: Dict[str, Any]):
         self.db_metadata = db_metadata
         self.table_names = self._build_table_name_set()
         self.table_logical_names = self._build_logical_name_map()
     
-    def _build_table_name_set(self) -> Set[str]:
-        """テーブル名セットを構築"""
-        tables = set()
-        for table in self.db_metadata.get('tables', []):
-            tables.add(table['table_name'].upper())
-            tables.add(table['table_name'].lower())
-        return tables
+    def _build_table_name_set(self) -> FrozenSet[str]:
+        """テーブル名セットを構築（大文字で正規化）"""
+        return frozenset(table['table_name'].upper() for table in self.db_metadata.get('tables', []))
     
     def _build_logical_name_map(self) -> Dict[str, str]:
-        """テーブル物理名 → 論理名 マッピング"""
+        """テーブル物理名（大文字） → 論理名 マッピング"""
         mapping = {}
         for table in self.db_metadata.get('tables', []):
             mapping[table['table_name'].upper()] = table.get('logical_name', table['table_name'])
-            mapping[table['table_name'].lower()] = table.get('logical_name', table['table_name'])
         return mapping
     
     def extract_from_code(self, code: str, class_name: str, 
                           method_name: Optional[str] = None) -> List[TableReference]:
         """コードからテーブル参照を抽出"""
-        references = []
-        
-        # SQL文からのテーブル抽出
-        for op_type, patterns in self.SQL_PATTERNS.items():
-            for pattern in patterns:
-                for match in re.finditer(pattern, code):
-                    table_name = match.group(1)
-                    if self._is_valid_table(table_name):
-                        references.append(TableReference(
-                            table_name=table_name,
-                            logical_name=self._get_logical_name(table_name),
-                            operation_type=op_type,
-                            source_class=class_name,
-                            source_method=method_name,
-                            context=self._extract_context(code, match.start()),
-                        ))
+        # SQL文からのテーブル抽出（1 回の走査で全パターンを評価）
+        # 出力順は従来どおり「パターン定義順 → 出現位置順」に揃える
+        buckets: List[List[TableReference]] = [[] for _ in self._SQL_OPS]
+        table_names = self.table_names
+        logical_names = self.table_logical_names
+        sql_ops = self._SQL_OPS
+        for k, (table_name,), pos in self._SQL_RE.scan(code):
+            # 有効なテーブル名のみ採用（大半の一致はここで棄却されるので参照生成前に判定）
+            # 予約語や一般的な変数名は除外
+            table_upper = table_name.upper()
+            if table_upper not in table_names or table_upper in _SQL_RESERVED_WORDS:
+                continue
+            buckets[k].append(TableReference(
+                table_name=table_name,
+                table_key=sys.intern(table_upper),
+                logical_name=logical_names.get(table_upper, table_name),
+                operation_type=sql_ops[k],
+                source_class=class_name,
+                source_method=method_name,
+                source_text=code,
+                context_pos=pos,
+            ))
+        references = [ref for bucket in buckets for ref in bucket]
         
         # GeneXus特有パターンからの抽出
         references.extend(self._extract_genexus_references(code, class_name, method_name))
@@ -248,75 +417,149 @@ class TableReferenceExtractor:
     def _extract_genexus_references(self, code: str, class_name: str,
                                     method_name: Optional[str]) -> List[TableReference]:
         """GeneXus特有のテーブル参照を抽出"""
-        references = []
+        buckets: List[List[TableReference]] = [[] for _ in self._GX_RE.names]
+        gx_names = self._GX_RE.names
         
         # Business Component参照
-        for pattern_name, pattern in self.GENEXUS_PATTERNS.items():
-            for match in re.finditer(pattern, code):
-                entity_name = match.group(1)
-                table_name = self._guess_table_from_entity(entity_name)
-                
-                if table_name:
-                    op_type = {
-                        'BC_LOAD': 'SELECT',
-                        'BC_SAVE': 'INSERT/UPDATE',
-                        'BC_DELETE': 'DELETE',
-                        'FOR_EACH': 'SELECT',
-                        'SDT_REF': 'REFERENCE',
-                    }.get(pattern_name, 'UNKNOWN')
-                    
-                    references.append(TableReference(
-                        table_name=table_name,
-                        logical_name=self._get_logical_name(table_name),
-                        operation_type=op_type,
-                        source_class=class_name,
-                        source_method=method_name,
-                        context=self._extract_context(code, match.start()),
-                    ))
+        for k, (entity_name,), pos in self._GX_RE.scan(code):
+            table_name = self._guess_table_from_entity(entity_name)
+            
+            if table_name:
+                buckets[k].append(TableReference(
+                    table_name=table_name,
+                    table_key=sys.intern(table_name),  # 推測結果は大文字名
+                    logical_name=self.table_logical_names.get(table_name, table_name),  # 推測結果は大文字名
+                    operation_type=self.GENEXUS_OPERATIONS.get(gx_names[k], 'UNKNOWN'),
+                    source_class=class_name,
+                    source_method=method_name,
+                    source_text=code,
+                    context_pos=pos,
+                ))
         
-        return references
-    
-    def _is_valid_table(self, name: str) -> bool:
-        """有効なテーブル名かチェック"""
-        # 予約語や一般的な変数名を除外
-        exclude = {'SELECT', 'FROM', 'WHERE', 'AND', 'OR', 'SET', 'INTO', 
-                   'VALUES', 'ORDER', 'GROUP', 'HAVING', 'LIMIT', 'OFFSET',
-                   'NULL', 'TRUE', 'FALSE', 'AS', 'ON', 'IN', 'NOT', 'LIKE'}
-        if name.upper() in exclude:
-            return False
-        return name.upper() in self.table_names or name.lower() in self.table_names
-    
-    def _get_logical_name(self, table_name: str) -> str:
-        """テーブルの論理名を取得"""
-        return self.table_logical_names.get(table_name.upper(), 
-               self.table_logical_names.get(table_name.lower(), table_name))
+        return [ref for bucket in buckets for ref in bucket]
     
     def _guess_table_from_entity(self, entity_name: str) -> Optional[str]:
         """エンティティ名からテーブル名を推測"""
         # 直接マッチ
-        if entity_name.upper() in self.table_names:
-            return entity_name.upper()
-        if entity_name.lower() in self.table_names:
-            return entity_name.lower()
+        entity_upper = entity_name.upper()
+        if entity_upper in self.table_names:
+            return entity_upper
         
         # プレフィックス除去してマッチ
-        for prefix in ['sdt_', 'type_', 'bc_', 'trn_']:
-            if entity_name.lower().startswith(prefix):
-                base_name = entity_name[len(prefix):]
-                if base_name.upper() in self.table_names:
-                    return base_name.upper()
+        m = _ENTITY_PREFIX_RE.match(entity_name)
+        if m:
+            base_upper = entity_name[m.end():].upper()
+            if base_upper in self.table_names:
+                return base_upper
         
         return None
-    
-    def _extract_context(self, code: str, position: int, context_length: int = 100) -> str:
-        """参照箇所の前後コンテキストを抽出"""
-        start = max(0, position - context_length // 2)
-        end = min(len(code), position + context_length // 2)
-        return code[start:end].replace('\n', ' ').strip()
+
+
+# ---------- 入力読み込み ----------
+
+# java_structure で保持するキー（imports / annotations など解析に使わないものは読み捨てる）
+_JAVA_FILE_KEYS = ('file', 'path', 'package', 'function_type')
+_JAVA_CLASS_KEYS = ('name', 'full_name', 'package', 'function_type', 'genexus_type')
+_JAVA_METHOD_KEYS = ('name', 'param_count', 'start_line', 'code', 'signature', 'sql_strings', 'calls')
+
+
+def _slim_file_entry(file_entry: Dict[str, Any]) -> Dict[str, Any]:
+    """ファイルエントリから解析に使うキーだけを残したコピーを作る"""
+    classes = []
+    for cls in file_entry.get('classes', []) or []:
+        slim_cls = {key: cls[key] for key in _JAVA_CLASS_KEYS if key in cls}
+        type_refs = (cls.get('dependencies') or {}).get('type_references')
+        if type_refs:
+            slim_cls['dependencies'] = {'type_references': type_refs}
+        slim_cls['methods'] = [
+            {key: m[key] for key in _JAVA_METHOD_KEYS if key in m}
+            for m in cls.get('methods', []) or []
+        ]
+        classes.append(slim_cls)
+    slim_entry = {key: file_entry[key] for key in _JAVA_FILE_KEYS if key in file_entry}
+    slim_entry['classes'] = classes
+    return slim_entry
+
+
+def _load_json_file(path: Path) -> Any:
+    """JSONファイルを読み込む（str へのデコードを挟まずバイト列のまま解析）"""
+    data = path.read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)  # UTF-8 のバイト列を直接受け付ける
+
+
+def _load_java_structure(path: Path) -> Dict[str, Any]:
+    """Java構造JSONを読み込む
+
+    ijson がインストールされていれば files を 1 件ずつストリーム処理し、
+    ファイル全体の辞書をメモリに展開しない。索引は restore_design でも使う files の一覧から
+    構築するので、解析に使うキーだけに絞った files 全体は保持する（索引の逐次構築はしない）。
+    """
+    if ijson is None:
+        structure = _load_json_file(path)
+        structure['files'] = [_slim_file_entry(fe) for fe in structure.get('files', []) or []]
+        return structure
+
+    structure: Dict[str, Any] = {}
+
+    def events(f):
+        # files 以外で参照するのは project_root と call_graph の上限値のみ（スカラーなので通過するイベントから拾う）
+        for prefix, event, value in ijson.parse(f):
+            if prefix == 'project_root' and event == 'string':
+                structure['project_root'] = value
+            elif prefix in ('call_graph.max_depth', 'call_graph.max_nodes') and event == 'number':
+                structure.setdefault('call_graph', {})[prefix[len('call_graph.'):]] = value
+            yield prefix, event, value
+
+    # 1 回の走査で files を 1 件ずつ組み立てつつスカラーも拾う（items はイベント列を最後まで読む）
+    with path.open('rb') as f:
+        structure['files'] = [_slim_file_entry(fe) for fe in ijson.items(events(f), 'files.item')]
+    return structure
 
 
 # ---------- 機能設計還元 ----------
 
+# クラス名の先頭単語（例: "OrderEdit" -> "Order"）。_extract_prefix 用
+_PREFIX_RE = re.compile(r'^([A-Z]?[a-z]+)')
+
+# GeneXusオブジェクト種別 → 機能名サフィックス（_infer_function_name 用）
+_GENEXUS_SUFFIX = {
+    'WebPanel': '画面',
+    'Transaction': '登録画面',
+    'WorkWithPlus': '一覧画面',
+    'Procedure': '処理',
+    'DataProvider': 'データ取得',
+    'Report': '帳票',
+}
+
+# CRUD区分 → 説明文での表記（_generate_description 用。この順で並べる）
+_CRUD_LABELS = (('CREATE', '登録'), ('READ', '参照'), ('UPDATE', '更新'), ('DELETE', '削除'))
+
+# クラス名キーワード → 日本語名（_class_name_to_japanese 用。出力はこの定義順）
+_CLASS_NAME_KEYWORDS: Tuple[Tuple[str, str], ...] = tuple({
+    'list': '一覧', 'detail': '詳細', 'edit': '編集', 'entry': '登録',
+    'search': '検索', 'inquiry': '照会', 'inq': '照会',
+    'report': '帳票', 'rpt': '帳票', 'print': '印刷',
+    'export': 'エクスポート', 'import': 'インポート',
+    'batch': 'バッチ', 'proc': '処理', 'calc': '計算',
+    'order': '受注', 'ord': '受注', 'purchase': '発注', 'po': '発注',
+    'customer': '得意先', 'cust': '得意先', 'supplier': '仕入先', 'sup': '仕入先',
+    'product': '商品', 'prd': '商品', 'item': '品目', 'itm': '品目',
+    'inventory': '在庫', 'inv': '在庫', 'stock': '在庫', 'stk': '在庫',
+    'user': 'ユーザー', 'usr': 'ユーザー', 'employee': '従業員', 'emp': '従業員',
+    'master': 'マスタ', 'mst': 'マスタ', 'maintenance': 'メンテナンス',
+    'home': 'ホーム', 'menu': 'メニュー', 'login': 'ログイン',
+}.items())
+
+_CLASS_NAME_KEYWORD_AUTOMATON = None
+if ahocorasick is not None:
+    _CLASS_NAME_KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _order, (_key, _) in enumerate(_CLASS_NAME_KEYWORDS):
+        _CLASS_NAME_KEYWORD_AUTOMATON.add_word(_key, _order)
+    _CLASS_NAME_KEYWORD_AUTOMATON.make_automaton()
+
+
 class FunctionDesignRestorer:
     """機能設計を還元"""
     
@@ -331,6 +574,7 @@ class FunctionDesignRestorer:
         self._progress_every: int = 20
         self._progress_methods_every: int = 200
         self._debug_callgraph: bool = False
+        self._jobs: int = 1  # restore_design の並列プロセス数（0 = CPU数）
 
         # Build a static call graph index so we can resolve "screen -> other" DB access.
         self._call_max_depth = int(java_structure.get('call_graph', {}).get('max_depth', 8)) if isinstance(java_structure, dict) else 8
@@ -354,18 +598,46 @@ class FunctionDesignRestorer:
             if cname:
                 self._class_fulls_by_class_name[cname].append(cfull)
 
-        # Cache resolved calls to avoid repeated candidate scans
-        self._call_resolve_cache: Dict[Tuple[str, str, int, Optional[str]], List[str]] = {}
-
-        self._method_refs_cache: Dict[str, List[TableReference]] = {}
-        self._method_columns_cache: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        # Integer method ids for traversal: visited/enqueued become bytearrays and
+        # edges become List[int], so the hot loop never hashes method_id strings.
+        self._method_recs: List[Dict[str, Any]] = list(self._method_index.values())
+        self._mid_to_idx: Dict[str, int] = {mid: i for i, mid in enumerate(self._method_index)}
+        # Static call graph adjacency (callee indexes per method), resolved once up front
+        self._adj: List[List[int]] = self._build_call_adjacency()
+
+        self._method_refs_cache: Dict[int, List[TableReference]] = {}
+        self._method_columns_cache: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+
+    @classmethod
+    def from_paths(cls, java_path: Path, db_path: Path) -> 'FunctionDesignRestorer':
+        """JSONファイルから生成（Java構造は _load_java_structure で読み込む）"""
+        java_structure = _load_java_structure(Path(java_path))
+        db_metadata = _load_json_file(Path(db_path))
+        return cls(java_structure, db_metadata)
     
     def _build_table_info(self) -> Dict[str, Dict[str, Any]]:
-        """テーブル情報辞書を構築"""
+        """テーブル情報辞書を構築（キーは大文字のテーブル名）
+
+        派生データは db_metadata のテーブル辞書を書き換えず、浅いコピーに載せる。
+        """
         info = {}
         for table in self.db_metadata.get('tables', []):
-            info[table['table_name'].upper()] = table
-            info[table['table_name'].lower()] = table
+            columns = table.get('columns', [])
+            info[table['table_name'].upper()] = {
+                **table,
+                # 使用カラム推定用のカラム名逆引き索引（メソッド毎の再計算を避ける）
+                '_cols_by_lower': _prepare_columns(columns),
+                # 機能毎の tables_used に載せる主要カラム（先頭10件）の雛形。_aggregate_tables で機能毎に複製する
+                '_top_columns': [
+                    {
+                        'name': col.get('name'),
+                        'logical_name': col.get('logical_name'),
+                        'data_type': col.get('data_type'),
+                        'is_primary_key': col.get('is_primary_key', False),
+                    }
+                    for col in islice(columns, 10)
+                ],
+            }
         return info
 
     def _build_call_graph_indexes(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
@@ -388,8 +660,10 @@ class FunctionDesignRestorer:
 
         for file_entry in self.java_structure.get('files', []):
             for cls in file_entry.get('classes', []):
-                class_name = cls.get('name', '')
-                class_full = cls.get('full_name') or (f"{cls.get('package')}.{class_name}" if cls.get('package') else class_name)
+                # Names repeat in every method record / index key: intern them so the
+                # copies share one object and dict lookups compare by identity first.
+                class_name = sys.intern(cls.get('name', ''))
+                class_full = sys.intern(cls.get('full_name') or (f"{cls.get('package')}.{class_name}" if cls.get('package') else class_name))
                 deps = cls.get('dependencies') or {}
                 type_refs = deps.get('type_references') or []
 
@@ -402,19 +676,13 @@ class FunctionDesignRestorer:
                 }
 
                 for m in cls.get('methods', []) or []:
-                    mname = m.get('name') or ''
+                    mname = sys.intern(m.get('name') or '')
                     if not mname:
                         continue
                     param_count = m.get('param_count', -1)
                     start_line = m.get('start_line', 0)
 
-                    # Build analysis text: excerpt/signature + extracted SQL literals
-                    text = (m.get('code') or '')
-                    if not text:
-                        text = (m.get('signature') or '')
-                    sql_strings = m.get('sql_strings') or []
-                    if sql_strings:
-                        text = text + "\n" + "\n".join(sql_strings)
+                    text = _method_analysis_text(m)
 
                     method_id = f"{class_full}::{mname}({param_count})@{start_line}"
                     method_index[method_id] = {
@@ -431,8 +699,16 @@ class FunctionDesignRestorer:
 
         return method_index, class_index
 
-    def _resolve_call_candidates(self, caller_class_full: str, call: Dict[str, Any]) -> List[str]:
-        """Resolve a call dict to candidate method_id list (best-effort)."""
+    def _resolve_call_candidates(
+        self,
+        caller_class_full: str,
+        call: Dict[str, Any],
+        cache: Optional[Dict[Tuple[str, str, int, Optional[str]], List[str]]] = None,
+    ) -> List[str]:
+        """Resolve a call dict to candidate method_id list (best-effort).
+
+        `cache` (optional) memoizes results by (caller, name, arg_count, qualifier).
+        """
         name = (call.get('name') or '').strip()
         if not name or name in _IGNORE_METHOD_NAMES:
             return []
@@ -443,9 +719,10 @@ class FunctionDesignRestorer:
         qualifier = _simplify_qualifier(call.get('qualifier'))
 
         cache_key = (caller_class_full, name, arg_count, qualifier)
-        cached = self._call_resolve_cache.get(cache_key)
-        if cached is not None:
-            return cached
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
 
         def pick_in_class(class_full: str) -> List[str]:
             mids = self._methods_by_class_and_name.get((class_full, name)) or []
@@ -498,9 +775,35 @@ class FunctionDesignRestorer:
                 uniq.append(c)
         if len(uniq) > 20:
             uniq = uniq[:20]
-        self._call_resolve_cache[cache_key] = uniq
+        if cache is not None:
+            cache[cache_key] = uniq
         return uniq
 
+    def _build_call_adjacency(self) -> List[List[int]]:
+        """Resolve every method's calls once into callee method indexes (call order, deduplicated)."""
+        # Memo is only needed while building: the same call shape repeats within a class
+        resolve_cache: Dict[Tuple[str, str, int, Optional[str]], List[str]] = {}
+        adj: List[List[int]] = []
+        for rec in self._method_recs:
+            seen: Set[int] = set()
+            neighbors: List[int] = []
+            for call in rec.get('calls') or []:
+                for cmid in self._resolve_call_candidates(rec['class_full'], call, resolve_cache):
+                    cidx = self._mid_to_idx[cmid]
+                    if cidx not in seen:
+                        seen.add(cidx)
+                        neighbors.append(cidx)
+            adj.append(neighbors)
+        return adj
+
+    def _method_tokens(self, rec: Dict[str, Any]) -> Set[str]:
+        """Identifier tokens of a method's analysis text (computed lazily, kept on the record)."""
+        tokens = rec.get('_tokens')
+        if tokens is None:
+            tokens = _tokenize_identifiers(rec.get('text') or '')
+            rec['_tokens'] = tokens
+        return tokens
+
     def _collect_references_for_class(self, cls_data: Dict[str, Any]) -> Tuple[List[TableReference], Dict[str, List[Dict[str, Any]]], Set[str]]:
         """Collect table references by traversing the call graph starting from a class' methods.
 
@@ -518,28 +821,33 @@ class FunctionDesignRestorer:
             all_references: List[TableReference] = []
             columns_used_map: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
             for m in cls_data.get('methods', []) or []:
-                method_code = (m.get('code') or '')
-                if not method_code:
-                    method_code = (m.get('signature') or '')
-                sql_strings = m.get('sql_strings') or []
-                if sql_strings:
-                    method_code = method_code + "\n" + "\n".join(sql_strings)
+                method_code = _method_analysis_text(m)
                 refs = self.extractor.extract_from_code(method_code, class_name, m.get('name'))
                 all_references.extend(refs)
                 for r in refs:
-                    tinfo = self.table_info.get(r.table_name.upper(), {})
-                    cols = tinfo.get('columns', [])
+                    tinfo = self.table_info.get(r.table_key, {})
+                    cols = tinfo.get('_cols_by_lower', {})
                     cols_used = _extract_used_columns(method_code, cols)
                     if cols_used:
-                        columns_used_map[r.table_name.upper()] = cols_used
+                        columns_used_map[r.table_key] = cols_used
             return all_references, columns_used_map, set()
 
-        # Call graph traversal
-        visited: Set[str] = set()
-        enqueued: Set[str] = set(entry_method_ids)
-        queue: deque[Tuple[str, int]] = deque((mid, 0) for mid in entry_method_ids)
+        # Call graph traversal (BFS over integer method indexes; queue is read via a cursor)
+        # The queue only holds method indexes; depth_of[idx] is the BFS depth set on
+        # first enqueue (-1 = not enqueued yet), so no (idx, depth) tuple per edge.
+        visited = bytearray(len(self._method_recs))
+        depth_of = array('i', [-1]) * len(self._method_recs)
+        visited_count = 0
+        queue: List[int] = [self._mid_to_idx[mid] for mid in entry_method_ids]
+        for idx in queue:
+            depth_of[idx] = 0
+        head = 0
         all_refs: List[TableReference] = []
+        # Unique refs only: (TABLE, operation, source class, source method) -> first occurrence kept
+        ref_seen: Set[Tuple[str, str, str, Optional[str]]] = set()
         columns_used_map: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        # Column names already merged into columns_used_map, per table
+        seen_cols: Dict[str, Set[Optional[str]]] = defaultdict(set)
         related_classes: Set[str] = set()
 
         # Progress stats for this class (method-level)
@@ -552,81 +860,87 @@ class FunctionDesignRestorer:
                 file=sys.stderr,
             )
 
-        while queue and len(visited) < self._call_max_nodes:
-            mid, depth = queue.popleft()
-            if mid in visited:
+        while head < len(queue) and visited_count < self._call_max_nodes:
+            idx = queue[head]
+            head += 1
+            if visited[idx]:
                 continue
-            visited.add(mid)
+            depth = depth_of[idx]
+            visited[idx] = 1
+            visited_count += 1
 
-            if self._debug_callgraph and (len(visited) % 200 == 0):
+            if self._debug_callgraph and (visited_count % 200 == 0):
                 print(
-                    f"[debug] {class_name}: visited={len(visited)}/{self._call_max_nodes} queue={len(queue)} depth={depth}",
+                    f"[debug] {class_name}: visited={visited_count}/{self._call_max_nodes} queue={len(queue) - head} depth={depth}",
                     file=sys.stderr,
                 )
 
-            if self._progress and self._progress_methods_every and (len(visited) % self._progress_methods_every == 0):
+            if self._progress and self._progress_methods_every and (visited_count % self._progress_methods_every == 0):
                 _cg_dt = time.perf_counter() - _cg_t0
-                _cg_rate = (len(visited) / _cg_dt) if _cg_dt > 0 else 0.0
+                _cg_rate = (visited_count / _cg_dt) if _cg_dt > 0 else 0.0
                 print(
-                    f"[progress] callgraph {class_name}: visited={len(visited)}/{self._call_max_nodes} queue={len(queue)} depth={depth} refs={len(all_refs)} tables={len(_cg_tables)} cache_hit={_cg_cache_hits}/{len(visited)} rate={_cg_rate:.1f} m/s",
+                    f"[progress] callgraph {class_name}: visited={visited_count}/{self._call_max_nodes} queue={len(queue) - head} depth={depth} refs={len(all_refs)} tables={len(_cg_tables)} cache_hit={_cg_cache_hits}/{visited_count} rate={_cg_rate:.1f} m/s",
                     file=sys.stderr,
                 )
 
-            rec = self._method_index.get(mid) or {}
+            rec = self._method_recs[idx]
             text = rec.get('text') or ''
             src_class = rec.get('class_name') or class_name
             src_method = rec.get('method_name')
 
             # Extract refs (cached)
-            if mid in self._method_refs_cache:
+            if idx in self._method_refs_cache:
                 _cg_cache_hits += 1
-                refs = self._method_refs_cache[mid]
-                cols_map = self._method_columns_cache.get(mid) or {}
+                refs = self._method_refs_cache[idx]
+                cols_map = self._method_columns_cache.get(idx) or {}
             else:
                 refs = self.extractor.extract_from_code(text, src_class, src_method)
                 cols_map: Dict[str, List[Dict[str, Any]]] = {}
                 if refs:
-                    tokens = _tokenize_identifiers(text)
+                    tokens = self._method_tokens(rec)
                     # columns used (heuristic) per table, computed once per table
-                    for t in {r.table_name.upper() for r in refs}:
+                    for t in {r.table_key for r in refs}:
                         tinfo = self.table_info.get(t, {})
-                        cols = tinfo.get('columns', [])
+                        cols = tinfo.get('_cols_by_lower', {})
                         cols_used = _extract_used_columns(text, cols, tokens=tokens)
                         if cols_used:
                             cols_map[t] = cols_used
-                self._method_refs_cache[mid] = refs
-                self._method_columns_cache[mid] = cols_map
-
-            all_refs.extend(refs)
+                self._method_refs_cache[idx] = refs
+                self._method_columns_cache[idx] = cols_map
+
+            for r in refs:
+                ref_key = (r.table_key, r.operation_type, r.source_class, r.source_method)
+                if ref_key not in ref_seen:
+                    ref_seen.add(ref_key)
+                    all_refs.append(r)
             if refs:
-                _cg_tables.update({r.table_name.upper() for r in refs if r.table_name})
+                _cg_tables.update({r.table_key for r in refs if r.table_key})
             for t, cols in (cols_map or {}).items():
                 # merge unique column dicts by name
-                existing = {c.get('name') for c in columns_used_map.get(t, [])}
+                seen = seen_cols[t]
                 for c in cols:
-                    if c.get('name') not in existing:
+                    name = c.get('name')
+                    if name not in seen:
+                        seen.add(name)
                         columns_used_map[t].append(c)
-                        existing.add(c.get('name'))
 
             # Follow calls
             if depth >= self._call_max_depth:
                 continue
-            for call in rec.get('calls') or []:
-                cands = self._resolve_call_candidates(rec.get('class_full') or class_full, call)
-                for cmid in cands:
-                    if cmid in visited or cmid in enqueued:
-                        continue
-                    enqueued.add(cmid)
-                    queue.append((cmid, depth + 1))
-                    callee_cls_full = (self._method_index.get(cmid) or {}).get('class_full')
-                    if callee_cls_full and callee_cls_full != class_full:
-                        related_classes.add((self._class_index.get(callee_cls_full) or {}).get('class_name', callee_cls_full))
+            for cidx in self._adj[idx]:
+                if depth_of[cidx] >= 0:
+                    continue
+                depth_of[cidx] = depth + 1
+                queue.append(cidx)
+                callee_cls_full = self._method_recs[cidx].get('class_full')
+                if callee_cls_full and callee_cls_full != class_full:
+                    related_classes.add((self._class_index.get(callee_cls_full) or {}).get('class_name', callee_cls_full))
 
         if self._progress:
             _cg_dt = time.perf_counter() - _cg_t0
-            _cg_rate = (len(visited) / _cg_dt) if _cg_dt > 0 else 0.0
+            _cg_rate = (visited_count / _cg_dt) if _cg_dt > 0 else 0.0
             print(
-                f"[progress] callgraph done : {class_name} visited={len(visited)} refs={len(all_refs)} tables={len(_cg_tables)} related_classes={len(related_classes)} cache_hit={_cg_cache_hits}/{len(visited) if visited else 0} time={_cg_dt:.1f}s rate={_cg_rate:.1f} m/s",
+                f"[progress] callgraph done : {class_name} visited={visited_count} refs={len(all_refs)} tables={len(_cg_tables)} related_classes={len(related_classes)} cache_hit={_cg_cache_hits}/{visited_count} time={_cg_dt:.1f}s rate={_cg_rate:.1f} m/s",
                 file=sys.stderr,
             )
 
@@ -638,40 +952,42 @@ class FunctionDesignRestorer:
         table_function_map = defaultdict(list)
 
         # Collect targets first so we can report progress accurately
-        targets: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
-        for file_entry in self.java_structure.get('files', []):
-            for cls_data in file_entry.get('classes', []):
+        # (files の添字, classes の添字)。並列実行時はこの添字だけをワーカーへ渡す
+        files = self.java_structure.get('files', [])
+        targets: List[Tuple[int, int]] = []
+        for fi, file_entry in enumerate(files):
+            for ci, cls_data in enumerate(file_entry.get('classes', [])):
                 func_type = cls_data.get('function_type', 'other')
                 if func_type in ('screen', 'batch'):
-                    targets.append((file_entry, cls_data))
+                    targets.append((fi, ci))
 
         total = len(targets)
         if self._progress:
             print(f"[progress] Step3: analyzing {total} screen/batch classes...", file=sys.stderr)
 
-        for idx, (file_entry, cls_data) in enumerate(targets, start=1):
-            class_name = cls_data.get('name', 'Unknown')
-            func_type = cls_data.get('function_type', 'other')
-            t0 = time.perf_counter()
+        jobs = self._jobs if self._jobs > 0 else (os.cpu_count() or 1)
+        if jobs > 1 and total > 1:
+            results = self._iter_restored_parallel(targets, jobs)
+        else:
+            results = self._iter_restored(targets)
 
-            if self._progress and (idx == 1 or idx % max(1, int(self._progress_every)) == 0):
-                print(f"[progress] ({idx}/{total}) start: {class_name} [{func_type}]", file=sys.stderr)
-
-            func_design = self._restore_function(cls_data, file_entry)
-            dt = time.perf_counter() - t0
+        for idx, ((fi, ci), (func_design, dt, cache_size)) in enumerate(zip(targets, results), start=1):
+            class_name = files[fi]['classes'][ci].get('name', 'Unknown')
 
             if func_design:
                 functions.append(func_design)
                 for table in func_design.tables_used:
                     table_function_map[table['table_name']].append(func_design.function_id)
 
-                if self._progress and (idx == 1 or idx % max(1, int(self._progress_every)) == 0):
+                if self._progress_due(idx):
+                    # 並列実行時のキャッシュはワーカー毎なので件数は出さない
+                    cache_note = f" visited_cache={cache_size}" if cache_size is not None else ""
                     print(
-                        f"[progress] ({idx}/{total}) done : {class_name} tables={len(func_design.tables_used)} visited_cache={len(self._method_refs_cache)} time={dt:.1f}s",
+                        f"[progress] ({idx}/{total}) done : {class_name} tables={len(func_design.tables_used)}{cache_note} time={dt:.1f}s",
                         file=sys.stderr,
                     )
             else:
-                if self._progress and (idx == 1 or idx % max(1, int(self._progress_every)) == 0):
+                if self._progress_due(idx):
                     print(
                         f"[progress] ({idx}/{total}) skip : {class_name} (no DB refs) time={dt:.1f}s",
                         file=sys.stderr,
@@ -690,6 +1006,51 @@ class FunctionDesignRestorer:
             er_diagram_data=self._build_er_data(),
         )
 
+    def _progress_due(self, idx: int) -> bool:
+        """idx 件目で進捗を出力するか（1 件目と progress_every 件ごと）"""
+        return self._progress and (idx == 1 or idx % max(1, int(self._progress_every)) == 0)
+
+    def _restore_target(self, target: Tuple[int, int]) -> Tuple[Optional[FunctionDesign], float]:
+        """Restore one screen/batch class given (file index, class index). Returns (function_design, elapsed_sec)."""
+        fi, ci = target
+        file_entry = self.java_structure['files'][fi]
+        t0 = time.perf_counter()
+        func_design = self._restore_function(file_entry['classes'][ci], file_entry)
+        return func_design, time.perf_counter() - t0
+
+    def _iter_restored(self, targets: List[Tuple[int, int]]) -> Iterator[Tuple[Optional[FunctionDesign], float, Optional[int]]]:
+        """Restore targets one by one in this process (lazily, so progress lines interleave)."""
+        files = self.java_structure['files']
+        total = len(targets)
+        for idx, (fi, ci) in enumerate(targets, start=1):
+            if self._progress_due(idx):
+                cls_data = files[fi]['classes'][ci]
+                print(f"[progress] ({idx}/{total}) start: {cls_data.get('name', 'Unknown')} [{cls_data.get('function_type', 'other')}]", file=sys.stderr)
+            func_design, dt = self._restore_target((fi, ci))
+            yield func_design, dt, len(self._method_refs_cache)
+
+    def _iter_restored_parallel(self, targets: List[Tuple[int, int]], jobs: int) -> Iterator[Tuple[Optional[FunctionDesign], float, Optional[int]]]:
+        """Restore targets in worker processes; results are yielded in target order.
+
+        各ワーカーは初期化時に 1 回だけ java_structure / db_metadata から自前の
+        FunctionDesignRestorer（索引・キャッシュ）を構築し、以降は (files の添字, classes の添字) だけを受け取る。
+        キャッシュはワーカー毎なので件数は返さない（None）。ワーカー内のコールグラフ進捗ログは出力しない。
+        """
+        if self._progress:
+            print(f"[progress] Step3: using {jobs} worker processes", file=sys.stderr)
+        settings = {
+            '_call_max_depth': self._call_max_depth,
+            '_call_max_nodes': self._call_max_nodes,
+        }
+        chunksize = max(1, min(8, len(targets) // (jobs * 4)))
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_restore_worker,
+            initargs=(self.java_structure, self.db_metadata, settings),
+        ) as executor:
+            for func_design, dt in executor.map(_restore_function_in_worker, targets, chunksize=chunksize):
+                yield func_design, dt, None
+
     def _resolve_related_functions_callgraph(self, functions: List[FunctionDesign]) -> None:
         """related_class_names（クラス名）を related_functions_callgraph（function_id）へ解決する"""
         class_to_func: Dict[str, str] = {}
@@ -745,38 +1106,34 @@ class FunctionDesignRestorer:
     def _aggregate_tables(self, references: List[TableReference], columns_used_map: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
         """テーブル参照を集計"""
         table_map = {}
+        used_names: Dict[str, Set[str]] = {}  # テーブル毎の columns_used 済みカラム名
         
         for ref in references:
-            key = ref.table_name.upper()
-            if key not in table_map:
+            key = ref.table_key
+            entry = table_map.get(key)
+            if entry is None:
                 table_info = self.table_info.get(key, {})
-                table_map[key] = {
+                entry = table_map[key] = {
                     'table_name': ref.table_name,
                     'logical_name': ref.logical_name,
                     'operations': set(),
                     'column_count': len(table_info.get('columns', [])),
                     'columns_used': [],
-                    'columns': [
-                        {
-                            'name': col.get('name'),
-                            'logical_name': col.get('logical_name'),
-                            'data_type': col.get('data_type'),
-                            'is_primary_key': col.get('is_primary_key', False),
-                        }
-                        for col in table_info.get('columns', [])[:10]  # 主要カラムのみ
-                    ],
+                    'columns': [dict(col) for col in table_info.get('_top_columns', [])],  # 主要カラムのみ（機能毎に別オブジェクト）
                 }
-            table_map[key]['operations'].add(ref.operation_type)
+                used_names[key] = set()
+            entry['operations'].add(ref.operation_type)
 
             # Merge heuristic used columns
             if columns_used_map:
-                cols_used = columns_used_map.get(key) or columns_used_map.get(ref.table_name.upper())
+                cols_used = columns_used_map.get(key)
                 if cols_used:
-                    existing = {c.get('name') for c in table_map[key].get('columns_used', [])}
+                    existing = used_names[key]
                     for c in cols_used:
-                        if c.get('name') and c.get('name') not in existing:
-                            table_map[key]['columns_used'].append(c)
-                            existing.add(c.get('name'))
+                        name = c.get('name')
+                        if name and name not in existing:
+                            entry['columns_used'].append(c)
+                            existing.add(name)
         
         # setをlistに変換
         for table in table_map.values():
@@ -786,75 +1143,47 @@ class FunctionDesignRestorer:
     
     def _build_crud_matrix(self, references: List[TableReference]) -> Dict[str, List[str]]:
         """CRUD操作マトリックスを構築"""
-        matrix = {'CREATE': [], 'READ': [], 'UPDATE': [], 'DELETE': []}
+        # dict を順序付き集合として使う（O(1) で重複判定しつつ初出順を保つ）
+        matrix: Dict[str, Dict[str, None]] = {'CREATE': {}, 'READ': {}, 'UPDATE': {}, 'DELETE': {}}
+        create, read, update, delete = matrix['CREATE'], matrix['READ'], matrix['UPDATE'], matrix['DELETE']
         
         for ref in references:
-            table_name = ref.table_name.upper()
+            table_name = ref.table_key
             op = ref.operation_type.upper()
             
             if 'INSERT' in op:
-                if table_name not in matrix['CREATE']:
-                    matrix['CREATE'].append(table_name)
+                create[table_name] = None
             if 'SELECT' in op or 'READ' in op:
-                if table_name not in matrix['READ']:
-                    matrix['READ'].append(table_name)
+                read[table_name] = None
             if 'UPDATE' in op:
-                if table_name not in matrix['UPDATE']:
-                    matrix['UPDATE'].append(table_name)
+                update[table_name] = None
             if 'DELETE' in op:
-                if table_name not in matrix['DELETE']:
-                    matrix['DELETE'].append(table_name)
+                delete[table_name] = None
         
-        return matrix
+        return {key: list(tables) for key, tables in matrix.items()}
     
     def _infer_function_name(self, class_name: str, tables_used: List[Dict],
                              genexus_type: Optional[str]) -> str:
         """機能名を推測"""
-        # テーブルの論理名から推測
-        if tables_used:
+        # テーブルの論理名から推測（GeneXus種別が分かる場合のみ）
+        if tables_used and genexus_type:
             main_table = tables_used[0]
             table_logical = main_table.get('logical_name', '')
-            
-            if genexus_type:
-                type_suffix = {
-                    'WebPanel': '画面',
-                    'Transaction': '登録画面',
-                    'WorkWithPlus': '一覧画面',
-                    'Procedure': '処理',
-                    'DataProvider': 'データ取得',
-                    'Report': '帳票',
-                }.get(genexus_type, '')
-                
-                if table_logical and table_logical != main_table['table_name']:
-                    return f"{table_logical}{type_suffix}"
+            if table_logical and table_logical != main_table['table_name']:
+                return f"{table_logical}{_GENEXUS_SUFFIX.get(genexus_type, '')}"
         
         # クラス名から推測
         return self._class_name_to_japanese(class_name)
     
     def _class_name_to_japanese(self, class_name: str) -> str:
         """クラス名から日本語名を推測"""
-        # プレフィックス/サフィックスマッピング
-        keywords = {
-            'list': '一覧', 'detail': '詳細', 'edit': '編集', 'entry': '登録',
-            'search': '検索', 'inquiry': '照会', 'inq': '照会',
-            'report': '帳票', 'rpt': '帳票', 'print': '印刷',
-            'export': 'エクスポート', 'import': 'インポート',
-            'batch': 'バッチ', 'proc': '処理', 'calc': '計算',
-            'order': '受注', 'ord': '受注', 'purchase': '発注', 'po': '発注',
-            'customer': '得意先', 'cust': '得意先', 'supplier': '仕入先', 'sup': '仕入先',
-            'product': '商品', 'prd': '商品', 'item': '品目', 'itm': '品目',
-            'inventory': '在庫', 'inv': '在庫', 'stock': '在庫', 'stk': '在庫',
-            'user': 'ユーザー', 'usr': 'ユーザー', 'employee': '従業員', 'emp': '従業員',
-            'master': 'マスタ', 'mst': 'マスタ', 'maintenance': 'メンテナンス',
-            'home': 'ホーム', 'menu': 'メニュー', 'login': 'ログイン',
-        }
-        
         name_lower = class_name.lower()
-        parts = []
-        
-        for key, value in keywords.items():
-            if key in name_lower:
-                parts.append(value)
+        if _CLASS_NAME_KEYWORD_AUTOMATON is not None:
+            # 1 回の走査で全キーワードの出現（重なりを含む）を拾い、定義順に並べる
+            found = {order for _, order in _CLASS_NAME_KEYWORD_AUTOMATON.iter(name_lower)}
+            parts = [_CLASS_NAME_KEYWORDS[order][1] for order in sorted(found)]
+        else:
+            parts = [value for key, value in _CLASS_NAME_KEYWORDS if key in name_lower]
         
         if parts:
             return ''.join(parts)
@@ -872,15 +1201,7 @@ class FunctionDesignRestorer:
             desc_parts.append(f"対象テーブル: {', '.join(table_names)}")
         
         # 操作内容
-        ops = []
-        if crud_matrix['CREATE']:
-            ops.append('登録')
-        if crud_matrix['READ']:
-            ops.append('参照')
-        if crud_matrix['UPDATE']:
-            ops.append('更新')
-        if crud_matrix['DELETE']:
-            ops.append('削除')
+        ops = [label for op, label in _CRUD_LABELS if crud_matrix[op]]
         
         if ops:
             desc_parts.append(f"操作: {'/'.join(ops)}")
@@ -896,24 +1217,23 @@ class FunctionDesignRestorer:
             prefix = self._extract_prefix(func.function_id)
             groups[prefix].append(func)
         
-        # グループ内で関連クラスを設定
-        for prefix, group_funcs in groups.items():
-            if len(group_funcs) > 1:
-                for func in group_funcs:
-                    prefix_related = [
-                        f.function_id for f in group_funcs
-                        if f.function_id != func.function_id
-                    ]
-                    func.related_functions_prefix = prefix_related
-
+        # グループ内で関連クラスを設定し、同じ走査で関連機能を統合する
         # 互換用 related_classes は function_id の配列として出力しつつ
         # コールグラフ由来/プレフィックス由来は別フィールドにも保持する
-        for func in functions:
-            call_related = getattr(func, 'related_functions_callgraph', []) or []
-            prefix_related = getattr(func, 'related_functions_prefix', []) or []
-            merged = sorted(set(call_related + prefix_related))
-            func.related_functions = merged
-            func.related_classes = merged
+        # （related_functions と related_classes は同じリストオブジェクトを共有する）
+        for group_funcs in groups.values():
+            all_ids = [f.function_id for f in group_funcs] if len(group_funcs) > 1 else None
+            for func in group_funcs:
+                if all_ids is not None:
+                    func_id = func.function_id
+                    func.related_functions_prefix = [fid for fid in all_ids if fid != func_id]
+                call_related = getattr(func, 'related_functions_callgraph', []) or []
+                prefix_related = getattr(func, 'related_functions_prefix', []) or []
+                if call_related or prefix_related:
+                    merged = sorted(set(call_related).union(prefix_related))
+                else:
+                    merged = []
+                func.related_functions = func.related_classes = merged
         
         return functions
     
@@ -922,7 +1242,7 @@ class FunctionDesignRestorer:
         if '_' in class_name:
             return class_name.split('_')[0].lower()
         
-        match = re.match(r'^([A-Z]?[a-z]+)', class_name)
+        match = _PREFIX_RE.match(class_name)
         if match:
             return match.group(1).lower()
         
@@ -930,11 +1250,9 @@ class FunctionDesignRestorer:
     
     def _build_er_data(self) -> Dict[str, Any]:
         """ER図データを構築"""
-        tables = []
-        relationships = []
-        
-        for table in self.db_metadata.get('tables', []):
-            tables.append({
+        # カラム毎の dict はリテラルで直接組み立てる（dict(zip(keys, values)) より速い）
+        tables = [
+            {
                 'name': table['table_name'],
                 'logical_name': table.get('logical_name', table['table_name']),
                 'columns': [
@@ -947,9 +1265,18 @@ class FunctionDesignRestorer:
                     }
                     for col in table.get('columns', [])
                 ],
-            })
+            }
+            for table in self.db_metadata.get('tables', [])
+        ]
         
+        # 同一の外部キー（複数カタログを結合したメタデータで重複しがち）は 1 件にまとめる
+        relationships = []
+        seen_fks: Set[Tuple[Any, ...]] = set()
         for fk in self.db_metadata.get('foreign_keys', []):
+            fk_key = (fk['from_table'], fk['to_table'], tuple(fk['from_columns']), tuple(fk['to_columns']))
+            if fk_key in seen_fks:
+                continue
+            seen_fks.add(fk_key)
             relationships.append({
                 'from_table': fk['from_table'],
                 'to_table': fk['to_table'],
@@ -964,8 +1291,69 @@ class FunctionDesignRestorer:
         }
 
 
+# ---------- 並列実行（ProcessPoolExecutor のワーカー） ----------
+
+_WORKER_RESTORER: Optional[FunctionDesignRestorer] = None
+
+
+def _init_restore_worker(java_structure: Dict[str, Any], db_metadata: Dict[str, Any],
+                         settings: Dict[str, Any]) -> None:
+    """ワーカープロセスの初期化: 索引を 1 回だけ構築して使い回す"""
+    global _WORKER_RESTORER
+    restorer = FunctionDesignRestorer(java_structure, db_metadata)
+    restorer._progress = False
+    for name, value in settings.items():
+        setattr(restorer, name, value)
+    _WORKER_RESTORER = restorer
+
+
+def _restore_function_in_worker(target: Tuple[int, int]) -> Tuple[Optional[FunctionDesign], float]:
+    """ワーカーで 1 クラスを還元し、(結果, 経過秒) を返す"""
+    return _WORKER_RESTORER._restore_target(target)
+
+
 # ---------- 出力フォーマット ----------
 
+def _dump_json_bytes(obj: Any) -> bytes:
+    """インデント 2 の UTF-8 JSON に変換（orjson があれば使用。ensure_ascii=False 相当）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+# 機能数がこれを超える設計ドキュメントは、全体を 1 つの文字列にせず functions を 1 件ずつ書き出す
+_STREAM_OUTPUT_THRESHOLD = 5000
+
+
+def _write_design_document(path: Path, design_doc: Dict[str, Any]) -> None:
+    """設計ドキュメントをJSONで保存
+
+    大規模なドキュメントはトップレベルの値と functions の要素を個別にシリアライズして
+    逐次書き出す（メモリ使用量は要素 1 件分）。インデントを揃えて出力するので、
+    内容は一括でシリアライズした場合と同一。
+    """
+    functions = design_doc.get('functions') or []
+    if len(functions) <= _STREAM_OUTPUT_THRESHOLD:
+        path.write_bytes(_dump_json_bytes(design_doc))
+        return
+
+    # JSON 文字列中の改行は \n にエスケープされるので、改行の置換でネストを字下げできる
+    with path.open('wb', buffering=1 << 20) as fp:
+        fp.write(b'{')
+        for i, (key, value) in enumerate(design_doc.items()):
+            fp.write(b',\n  ' if i else b'\n  ')
+            fp.write(_dump_json_bytes(key) + b': ')
+            if key == 'functions':
+                fp.write(b'[')
+                for j, func in enumerate(value):
+                    fp.write(b',\n    ' if j else b'\n    ')
+                    fp.write(_dump_json_bytes(func).replace(b'\n', b'\n    '))
+                fp.write(b'\n  ]')
+            else:
+                fp.write(_dump_json_bytes(value).replace(b'\n', b'\n  '))
+        fp.write(b'\n}')
+
+
 def format_design_document(design: SystemDesign) -> Dict[str, Any]:
     """設計ドキュメントをフォーマット"""
     
@@ -994,11 +1382,12 @@ def format_design_document(design: SystemDesign) -> Dict[str, Any]:
             'related_functions': func.related_functions,
         })
     
-    # 統計情報
+    # 統計情報（機能タイプ別件数は 1 回の走査で数える）
+    type_counts = Counter(f.function_type for f in design.functions)
     stats = {
         'total_functions': len(design.functions),
-        'screen_functions': len([f for f in design.functions if f.function_type == 'screen']),
-        'batch_functions': len([f for f in design.functions if f.function_type == 'batch']),
+        'screen_functions': type_counts['screen'],
+        'batch_functions': type_counts['batch'],
         'total_tables': len(design.er_diagram_data.get('tables', [])),
         'total_relationships': len(design.er_diagram_data.get('relationships', [])),
     }
@@ -1030,22 +1419,29 @@ def print_design_summary(design_doc: Dict[str, Any]):
     
     print(f"\n【機能一覧】")
     
+    # 画面/バッチ機能を 1 回の走査で振り分け
+    screen_funcs = []
+    batch_funcs = []
+    for f in functions:
+        if f['type'] == 'screen':
+            screen_funcs.append(f)
+        elif f['type'] == 'batch':
+            batch_funcs.append(f)
+    
     # 画面機能
-    screen_funcs = [f for f in functions if f['type'] == 'screen']
     if screen_funcs:
         print(f"\n  ■ 画面機能 ({len(screen_funcs)}件)")
         for func in screen_funcs[:10]:
-            tables = ', '.join([t['logical_name'] for t in func['tables'][:3]])
+            tables = ', '.join(t['logical_name'] for t in islice(func['tables'], 3))
             gx_type = f"[{func['genexus_type']}]" if func['genexus_type'] else ""
             print(f"    · {func['name']} {gx_type}")
             print(f"      テーブル: {tables}")
     
     # バッチ機能
-    batch_funcs = [f for f in functions if f['type'] == 'batch']
     if batch_funcs:
         print(f"\n  ■ バッチ機能 ({len(batch_funcs)}件)")
         for func in batch_funcs[:10]:
-            tables = ', '.join([t['logical_name'] for t in func['tables'][:3]])
+            tables = ', '.join(t['logical_name'] for t in islice(func['tables'], 3))
             gx_type = f"[{func['genexus_type']}]" if func['genexus_type'] else ""
             print(f"    · {func['name']} {gx_type}")
             print(f"      テーブル: {tables}")
@@ -1054,8 +1450,8 @@ def print_design_summary(design_doc: Dict[str, Any]):
     matrix = design_doc.get('table_function_matrix', {})
     if matrix:
         print(f"\n【テーブル-機能マトリックス】(主要テーブル)")
-        for table_name, func_ids in list(matrix.items())[:10]:
-            er_tables = {t['name']: t for t in design_doc.get('er_diagram', {}).get('tables', [])}
+        er_tables = {t['name']: t for t in design_doc.get('er_diagram', {}).get('tables', [])}
+        for table_name, func_ids in islice(matrix.items(), 10):
             logical_name = er_tables.get(table_name, {}).get('logical_name', table_name)
             print(f"    · {logical_name} ({table_name})")
             print(f"      使用機能: {len(func_ids)}件")
@@ -1086,6 +1482,8 @@ def main():
                         help="コールグラフ進捗表示の間隔（メソッド訪問 N件ごと） (default: 200)")
     parser.add_argument("--debug-callgraph", action="store_true",
                         help="コールグラフ追跡の詳細ログを出力（重いので注意）")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="画面/バッチクラス解析の並列プロセス数（0 = CPU数） (default: 1)")
 
     args = parser.parse_args()
     
@@ -1100,17 +1498,15 @@ def main():
     
     t_start = time.perf_counter()
     print(f"[情報] Java構造を読み込み中: {java_path}")
-    java_structure = json.loads(java_path.read_text(encoding='utf-8'))
-    
     print(f"[情報] DBメタデータを読み込み中: {db_path}")
-    db_metadata = json.loads(db_path.read_text(encoding='utf-8'))
+    restorer = FunctionDesignRestorer.from_paths(java_path, db_path)
     
     print(f"[情報] 機能設計を還元中...")
-    restorer = FunctionDesignRestorer(java_structure, db_metadata)
     restorer._progress = bool(args.progress)
     restorer._progress_every = max(1, int(args.progress_every))
     restorer._progress_methods_every = max(1, int(args.progress_methods_every))
     restorer._debug_callgraph = bool(args.debug_callgraph)
+    restorer._jobs = max(0, int(args.jobs))
     # Override traversal limits from CLI
     restorer._call_max_depth = max(0, int(args.call_depth))
     restorer._call_max_nodes = max(1, int(args.call_nodes))
@@ -1118,10 +1514,7 @@ def main():
     
     design_doc = format_design_document(design)
     
-    output_path.write_text(
-        json.dumps(design_doc, ensure_ascii=False, indent=2),
-        encoding='utf-8'
-    )
+    _write_design_document(output_path, design_doc)
     
     if not args.quiet:
         print_design_summary(design_doc)
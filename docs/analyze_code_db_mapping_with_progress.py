@@ -19,11 +19,35 @@ GeneXus生成JavaコードからSQL/テーブル参照を抽出し、
 import argparse
 import json
 import re
+import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Set, Tuple, Optional
-from dataclasses import dataclass, field, asdict
-from collections import defaultdict
+from typing import Dict, FrozenSet, Iterator, List, Any, Set, Tuple, Optional
+from dataclasses import dataclass, field, asdict, replace
+from collections import Counter, defaultdict, deque
+from itertools import islice
+
+# Optional deps
+try:
+    import ijson  # type: ignore  # 大きな java_structure.json のストリーム読み込み用
+except Exception:
+    ijson = None
+
+try:
+    import orjson  # type: ignore  # 高速な JSON 読み書き（未インストールなら標準 json）
+except Exception:
+    orjson = None
+
+try:
+    import hyperscan  # type: ignore  # Hyperscan（SQL/GeneXus パターンの事前フィルタ用）
+except Exception:
+    hyperscan = None
+
+try:
+    import ahocorasick  # type: ignore  # pyahocorasick（カラム名・クラス名キーワードの一括照合用）
+except Exception:
+    ahocorasick = None
 
 
 # ---------- 呼び出し関係（コールグラフ） ----------
@@ -38,6 +62,10 @@ _IGNORE_METHOD_NAMES = {
 }
 
 
+_NEW_EXPR_RE = re.compile(r"\bnew\s+([A-Za-z_][A-Za-z0-9_]*)\b")
+_NON_IDENT_CHAR_RE = re.compile(r"[^A-Za-z0-9_]")
+
+
 def _simplify_qualifier(text: Optional[str]) -> Optional[str]:
     """Best-effort simplification for a call qualifier.
 
@@ -55,7 +83,7 @@ def _simplify_qualifier(text: Optional[str]) -> Optional[str]:
         return None
 
     # "new Type(...)" -> Type
-    m = re.search(r"\bnew\s+([A-Za-z_][A-Za-z0-9_]*)\b", q)
+    m = _NEW_EXPR_RE.search(q)
     if m:
         return m.group(1)
 
@@ -65,7 +93,7 @@ def _simplify_qualifier(text: Optional[str]) -> Optional[str]:
     if '.' in q:
         q = q.rsplit('.', 1)[-1].strip()
     # Keep only identifier-like token
-    q = re.sub(r"[^A-Za-z0-9_]", "", q)
+    q = _NON_IDENT_CHAR_RE.sub("", q)
     return q or None
 
 
@@ -73,38 +101,138 @@ def _looks_like_class_name(name: str) -> bool:
     return bool(name) and name[0].isupper()
 
 
-def _extract_used_columns(text: str, columns: List[Dict[str, Any]], max_cols: int = 25) -> List[Dict[str, Any]]:
+def _is_word_char(ch: str) -> bool:
+    """Same test as regex `\\w` on str patterns (Unicode alphanumerics and underscore)."""
+    return ch == '_' or ch.isalnum()
+
+
+def _build_column_automaton(db_metadata: Dict[str, Any]) -> Optional[Any]:
+    """Build an Aho-Corasick automaton over the lowered column names of all tables.
+
+    Returns None when pyahocorasick is not installed (callers fall back to regex).
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for table in db_metadata.get('tables', []):
+        for col in table.get('columns', []) or []:
+            name = (col.get('name') or '').strip()
+            if len(name) > 2:
+                key = name.lower()
+                automaton.add_word(key, key)
+    if len(automaton) == 0:
+        return None
+    automaton.make_automaton()
+    return automaton
+
+
+def _find_column_names(automaton: Optional[Any], text: str) -> Optional[Set[str]]:
+    """Find every column name occurring as a whole word in `text` with one scan.
+
+    Returns the set of lowered names, with the same word-boundary rule as
+    `\\b{name}\\b`; None means "not available, use the regex fallback".
+    """
+    if automaton is None or not text:
+        return None
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # lower() changed the length (rare Unicode chars): positions would not line up
+        return None
+    n = len(text)
+    found: Set[str] = set()
+    for end, key in automaton.iter(lowered):
+        if key in found:
+            continue
+        start = end - len(key) + 1
+        if (start > 0 and _is_word_char(text[start - 1])) == _is_word_char(text[start]):
+            continue
+        if (end + 1 < n and _is_word_char(text[end + 1])) == _is_word_char(text[end]):
+            continue
+        found.add(key)
+    return found
+
+
+def _prepare_columns(columns: List[Dict[str, Any]]) -> List[Tuple[str, str, Optional[str]]]:
+    """Pre-process table columns for `_extract_used_columns`.
+
+    Returns (name, lowered name, logical_name) per column, once per table;
+    names of 2 chars or less are dropped since they create many false positives.
+    """
+    prepared: List[Tuple[str, str, Optional[str]]] = []
+    for col in columns:
+        name = (col.get('name') or '').strip()
+        if len(name) <= 2:
+            continue
+        prepared.append((name, name.lower(), col.get('logical_name')))
+    return prepared
+
+
+def _extract_used_columns(
+    text: str,
+    columns: List[Tuple[str, str, Optional[str]]],
+    found: Set[str],
+    max_cols: int = 25,
+) -> List[Dict[str, Any]]:
     """Extract likely-used column names by scanning the SQL/code text.
 
     This is a heuristic (static analysis) and may over/under-approximate.
+    `columns` is the list built by `_prepare_columns`. `found` is the set of
+    lower-cased column names that appear in the text (`_find_column_names` or
+    the per-table column regex); columns are matched by set lookup.
     """
     used: List[Dict[str, Any]] = []
     if not text:
         return used
-    # Lower for case-insensitive contains; regex is still used for word boundary
-    for col in columns:
-        name = (col.get('name') or '').strip()
-        if not name:
-            continue
-        # Avoid extremely short tokens that create many false positives
-        if len(name) <= 2:
-            continue
-        try:
-            if re.search(rf"\b{re.escape(name)}\b", text, flags=re.IGNORECASE):
-                used.append({
-                    'name': name,
-                    'logical_name': col.get('logical_name'),
-                })
-        except re.error:
-            continue
-        if len(used) >= max_cols:
-            break
+    for name, lowered, logical_name in columns:
+        if lowered in found:
+            used.append({
+                'name': name,
+                'logical_name': logical_name,
+            })
+            if len(used) >= max_cols:
+                break
     return used
 
 
+class _LRUCache:
+    """Bounded mapping that evicts the least recently used entry (maxsize <= 0: unbounded).
+
+    Relies on dict insertion order: a hit re-inserts the key at the end, eviction drops the first key.
+    """
+
+    __slots__ = ('maxsize', '_data')
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: Dict[Any, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._data
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        data = self._data
+        try:
+            value = data.pop(key)
+        except KeyError:
+            return default
+        data[key] = value
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        data = self._data
+        data.pop(key, None)
+        data[key] = value
+        if 0 < self.maxsize < len(data):
+            del data[next(iter(data))]
+
+
 # ---------- データ構造 ----------
+# NOTE: 参照数・機能数が多い大規模プロジェクト向けに slots=True（インスタンス毎の __dict__ を持たない）
 
-@dataclass
+@dataclass(slots=True)
 class TableReference:
     """テーブル参照情報"""
     table_name: str                    # テーブル物理名
@@ -112,10 +240,16 @@ class TableReference:
     operation_type: str                # SELECT/INSERT/UPDATE/DELETE
     source_class: str                  # 参照元クラス
     source_method: Optional[str]       # 参照元メソッド
-    context: str                       # 参照コンテキスト（コード断片）
+    source_text: str = field(repr=False)  # 参照元コード（メソッドテキストを共有し、コピーしない）
+    context_pos: int = field(repr=False)  # source_text 内の一致位置
+
+    @property
+    def context(self) -> str:
+        """参照コンテキスト（コード断片）。参照毎に保持せず、必要な時だけ切り出す"""
+        return _reference_context(self.source_text, self.context_pos)
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionDesign:
     """機能設計情報"""
     function_name: str                 # 機能名（日本語）
@@ -129,7 +263,7 @@ class FunctionDesign:
     crud_matrix: Dict[str, List[str]]  # CRUD操作マトリックス
 
 
-@dataclass
+@dataclass(slots=True)
 class SystemDesign:
     """システム設計情報"""
     project_name: str
@@ -140,81 +274,251 @@ class SystemDesign:
 
 # ---------- SQL/テーブル参照抽出 ----------
 
+def _reference_context(code: str, position: int, context_length: int = 100) -> str:
+    """参照箇所の前後コンテキストを抽出（改行は空白に置換）"""
+    start = max(0, position - context_length // 2)
+    end = min(len(code), position + context_length // 2)
+    return code[start:end].replace('\n', ' ').strip()
+
+
+# 大文字のエスケープ（\S \W \B \D など）。これを含むパターンは小文字化すると意味が変わる
+_UPPER_ESCAPE_RE = re.compile(r'\\[A-Z]')
+
+
+def _stop_on_first_match(pattern_id: int, start: int, end: int, flags: int, context: Any) -> bool:
+    """Hyperscan の一致コールバック: 最初の一致で走査を打ち切る"""
+    return True
+
+
+class _FusedPatterns:
+    """複数の正規表現を 1 回の走査で評価する結合パターン.
+
+    全パターンを 1 つの先読み ``(?=(?:(?P<a>...)|(?P<b>...)|...))`` にまとめて finditer し、
+    一致したパターン（lastindex）で振り分ける。先読みなので一致箇所を消費せず、
+    「DELETE FROM t」の FROM のように別位置から始まる重複一致も検出できる。
+    同一位置で後続パターンも一致しうる場合（例: sdt_x_bc.load の BC と SDT）は、
+    一致位置でのみ後続パターンを個別に match して補う。
+
+    パターン毎に直前に採用した一致の終端より前から始まる一致は捨てるので、
+    結果は各パターンを個別に re.finditer した場合と同じになる
+    （例: 「UPDATE UPDATE t」の 2 つ目の UPDATE や sdt_sdt_x の 2 つ目の sdt_ は拾わない）。
+    パターンは IGNORECASE でコンパイルする。
+    guard には全パターンの一致開始位置が必ず満たす条件（例: ``\\b(?=[fj])``）を指定でき、
+    先読みの評価を候補位置に絞る（結果は変わらない）。
+
+    hyperscan がインストールされていれば、同じパターン群の Hyperscan データベースで
+    「どれか 1 つでも一致するか」を先に判定し、一致しないテキストは走査しない。
+    Hyperscan はキャプチャを返さないため抽出自体は re で行う。
+
+    ASCII のみのテキストは小文字化してから小文字の（IGNORECASE なしの）パターンで走査する。
+    エンジン内で 1 文字ごとに大文字小文字を畳み込む分岐がなくなる。抽出文字列は元テキストから切り出す。
+    非 ASCII テキストは Unicode の大文字小文字規則を保つため IGNORECASE 版で走査する。
+    """
+
+    __slots__ = ('names', 'fused', '_fused_lower', '_alternatives', '_by_lastindex', '_prefilter')
+
+    def __init__(self, named_patterns: List[Tuple[str, str]], guard: str = ''):
+        self.names = [name for name, _ in named_patterns]
+        self.fused = re.compile(self._join(named_patterns, guard), re.IGNORECASE)
+        # 小文字化したパターン（\S などの大文字エスケープを含む場合は小文字化できないので None）
+        lowered = [(name, pattern.lower()) for name, pattern in named_patterns]
+        lowerable = not any(_UPPER_ESCAPE_RE.search(pattern) for _, pattern in named_patterns + [('', guard)])
+        self._fused_lower = re.compile(self._join(lowered, guard.lower())) if lowerable else None
+        # (結合パターン内でのパターン全体のグループ番号, キャプチャグループ数, 個別コンパイル済みパターン, 同・小文字版)
+        self._alternatives: List[Tuple[int, int, re.Pattern, Optional[re.Pattern]]] = []
+        for (name, pattern), (_, lowered_pattern) in zip(named_patterns, lowered):
+            single = re.compile(pattern, re.IGNORECASE)
+            self._alternatives.append((
+                self.fused.groupindex[name],
+                single.groups,
+                single,
+                re.compile(lowered_pattern) if lowerable else None,
+            ))
+        self._by_lastindex = {self.fused.groupindex[name]: k for k, name in enumerate(self.names)}
+        self._prefilter = self._build_prefilter([pattern for _, pattern in named_patterns])
+
+    @staticmethod
+    def _join(named_patterns: List[Tuple[str, str]], guard: str) -> str:
+        return guard + '(?=(?:' + '|'.join(f"(?P<{name}>{pattern})" for name, pattern in named_patterns) + '))'
+
+    @staticmethod
+    def _build_prefilter(patterns: List[str]) -> Optional[Any]:
+        """全パターンの Hyperscan データベースを構築（利用不可なら None）"""
+        if hyperscan is None:
+            return None
+        try:
+            database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            database.compile(
+                expressions=[pattern.encode('ascii') for pattern in patterns],
+                ids=list(range(len(patterns))),
+                elements=len(patterns),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns),
+            )
+            return database
+        except Exception:
+            return None
+
+    def may_match(self, code: str) -> bool:
+        """いずれかのパターンが一致しうるか（False なら scan は何も返さない）"""
+        # 非 ASCII テキストは \\w / IGNORECASE の Unicode 解釈が Hyperscan と揃わないため判定しない
+        if self._prefilter is None or not code.isascii():
+            return True
+        try:
+            self._prefilter.scan(code.encode('ascii'), match_event_handler=_stop_on_first_match)
+        except hyperscan.ScanTerminated:
+            return True
+        return False
+
+    def scan(self, code: str) -> Iterator[Tuple[int, Tuple[str, ...], int]]:
+        """(パターン番号, キャプチャグループの文字列のタプル, 一致開始位置) を出現位置順に列挙する"""
+        if not self.may_match(code):
+            return
+        if self._fused_lower is not None and code.isascii():
+            subject, fused, variant = code.lower(), self._fused_lower, 3
+        else:
+            subject, fused, variant = code, self.fused, 2
+        alternatives = self._alternatives
+        count = len(alternatives)
+        ends = [0] * count  # パターン毎の直前の採用一致の終端（個別 finditer の再開位置）
+        for m in fused.finditer(subject):
+            pos = m.start()
+            k = self._by_lastindex[m.lastindex]
+            base, ngroups = alternatives[k][0], alternatives[k][1]
+            if pos >= ends[k]:
+                ends[k] = m.end(base)
+                # 小文字化したテキストを走査した場合もあるので、グループは元テキストから切り出す
+                yield k, tuple(code[m.start(g):m.end(g)] for g in range(base + 1, base + ngroups + 1)), pos
+            for j in range(k + 1, count):
+                if pos < ends[j]:
+                    continue
+                m2 = alternatives[j][variant].match(subject, pos)
+                if m2:
+                    ends[j] = m2.end()
+                    yield j, tuple(code[m2.start(g):m2.end(g)] for g in range(1, alternatives[j][1] + 1)), pos
+
+
 class TableReferenceExtractor:
     """コードからテーブル参照を抽出"""
     
-    # SQL文パターン
+    # SQL文パターン（大文字小文字は区別しない: _SQL_RE で IGNORECASE 指定）
     SQL_PATTERNS = {
         'SELECT': [
-            r'(?i)\bFROM\s+([A-Za-z_][A-Za-z0-9_]*)',
-            r'(?i)\bJOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
-            r'(?i)\bINNER\s+JOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
-            r'(?i)\bLEFT\s+JOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
-            r'(?i)\bRIGHT\s+JOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bFROM\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bJOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bINNER\s+JOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bLEFT\s+JOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bRIGHT\s+JOIN\s+([A-Za-z_][A-Za-z0-9_]*)',
         ],
         'INSERT': [
-            r'(?i)\bINSERT\s+INTO\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bINSERT\s+INTO\s+([A-Za-z_][A-Za-z0-9_]*)',
         ],
         'UPDATE': [
-            r'(?i)\bUPDATE\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bUPDATE\s+([A-Za-z_][A-Za-z0-9_]*)',
         ],
         'DELETE': [
-            r'(?i)\bDELETE\s+FROM\s+([A-Za-z_][A-Za-z0-9_]*)',
+            r'\bDELETE\s+FROM\s+([A-Za-z_][A-Za-z0-9_]*)',
         ],
     }
     
-    # GeneXus特有のパターン
+    # GeneXus特有のパターン（大文字小文字は区別しない: _GX_RE で IGNORECASE 指定）
     GENEXUS_PATTERNS = {
         # Business Componentによるテーブルアクセス
-        'BC_LOAD': r'(?i)(\w+)_bc\s*[.]\s*load',
-        'BC_SAVE': r'(?i)(\w+)_bc\s*[.]\s*save',
-        'BC_DELETE': r'(?i)(\w+)_bc\s*[.]\s*delete',
+        'BC_LOAD': r'(\w+)_bc\s*[.]\s*load',
+        'BC_SAVE': r'(\w+)_bc\s*[.]\s*save',
+        'BC_DELETE': r'(\w+)_bc\s*[.]\s*delete',
         # GeneXusのFor Each
-        'FOR_EACH': r'(?i)for\s+each\s+(\w+)',
+        'FOR_EACH': r'for\s+each\s+(\w+)',
         # SDT参照
-        'SDT_REF': r'(?i)sdt_(\w+)',
+        'SDT_REF': r'sdt_(\w+)',
+    }
+
+    # GeneXusパターン → 操作種別
+    GENEXUS_OPERATIONS = {
+        'BC_LOAD': 'SELECT',
+        'BC_SAVE': 'INSERT/UPDATE',
+        'BC_DELETE': 'DELETE',
+        'FOR_EACH': 'SELECT',
+        'SDT_REF': 'REFERENCE',
     }
+
+    # 全パターンを結合した単一パターン（クラス定義時に 1 回だけコンパイルし、全インスタンスで共有）
+    _SQL_RE = _FusedPatterns([
+        (f"{op_type}_{i}", pattern)
+        for op_type, patterns in SQL_PATTERNS.items()
+        for i, pattern in enumerate(patterns)
+    ], guard=r'\b(?=[fijlrud])')  # 全 SQL パターンは \b + FROM/JOIN/INNER/LEFT/RIGHT/INSERT/UPDATE/DELETE で始まる
+    # パターン番号 → 操作種別
+    _SQL_OPS = [op_type for op_type, patterns in SQL_PATTERNS.items() for _ in patterns]
+    _GX_RE = _FusedPatterns(list(GENEXUS_PATTERNS.items()), guard=r'(?=\w)')  # 全パターンは単語文字から始まる
+
+    # テーブル名として扱わない予約語・一般的な変数名（大文字）
+    _EXCLUDE = frozenset({
+        'SELECT', 'FROM', 'WHERE', 'AND', 'OR', 'SET', 'INTO',
+        'VALUES', 'ORDER', 'GROUP', 'HAVING', 'LIMIT', 'OFFSET',
+        'NULL', 'TRUE', 'FALSE', 'AS', 'ON', 'IN', 'NOT', 'LIKE',
+    })
+
+    # 同一コード本文の抽出結果キャッシュの上限件数（超過時は最も古く使われたものから破棄）
+    TEXT_CACHE_SIZE = 4096
     
     def __init__(self, db_metadata: Dict[str, Any]):
         self.db_metadata = db_metadata
         self.table_names = self._build_table_name_set()
         self.table_logical_names = self._build_logical_name_map()
+        # コード本文 → 抽出結果（GeneXus生成コードは同一の定型 SQL を持つメソッドが多い）
+        self._text_cache = _LRUCache(self.TEXT_CACHE_SIZE)
+        # 全カラム名の Aho-Corasick オートマトン（pyahocorasick 未インストール時は None）
+        self._col_automaton = _build_column_automaton(db_metadata)
+
+    def find_column_names(self, text: str) -> Optional[Set[str]]:
+        """テキスト中に単語として現れるカラム名（小文字）を 1 回の走査で列挙（利用不可なら None）"""
+        return _find_column_names(self._col_automaton, text)
     
-    def _build_table_name_set(self) -> Set[str]:
-        """テーブル名セットを構築"""
-        tables = set()
-        for table in self.db_metadata.get('tables', []):
-            tables.add(table['table_name'].upper())
-            tables.add(table['table_name'].lower())
-        return tables
+    def _build_table_name_set(self) -> FrozenSet[str]:
+        """テーブル名セットを構築（大文字のみ。照合側で upper() して引く）"""
+        return frozenset(sys.intern(table['table_name'].upper()) for table in self.db_metadata.get('tables', []))
     
     def _build_logical_name_map(self) -> Dict[str, str]:
-        """テーブル物理名 → 論理名 マッピング"""
+        """テーブル物理名（大文字） → 論理名 マッピング"""
         mapping = {}
         for table in self.db_metadata.get('tables', []):
-            mapping[table['table_name'].upper()] = table.get('logical_name', table['table_name'])
-            mapping[table['table_name'].lower()] = table.get('logical_name', table['table_name'])
+            name = table['table_name']
+            mapping[name.upper()] = table.get('logical_name', name)
         return mapping
     
     def extract_from_code(self, code: str, class_name: str, 
                           method_name: Optional[str] = None) -> List[TableReference]:
-        """コードからテーブル参照を抽出"""
-        references = []
-        
-        # SQL文からのテーブル抽出
-        for op_type, patterns in self.SQL_PATTERNS.items():
-            for pattern in patterns:
-                for match in re.finditer(pattern, code):
-                    table_name = match.group(1)
-                    if self._is_valid_table(table_name):
-                        references.append(TableReference(
-                            table_name=table_name,
-                            logical_name=self._get_logical_name(table_name),
-                            operation_type=op_type,
-                            source_class=class_name,
-                            source_method=method_name,
-                            context=self._extract_context(code, match.start()),
-                        ))
+        """コードからテーブル参照を抽出
+
+        同一本文の再抽出は正規表現を走らせず、キャッシュ済み結果の
+        source_class / source_method だけを差し替えたコピーを返す。
+        """
+        cached = self._text_cache.get(code)
+        if cached is not None:
+            return [replace(ref, source_class=class_name, source_method=method_name) for ref in cached]
+
+        references = self._extract_uncached(code, class_name, method_name)
+        self._text_cache[code] = references
+        return list(references)
+
+    def _extract_uncached(self, code: str, class_name: str,
+                          method_name: Optional[str]) -> List[TableReference]:
+        """正規表現を走査してテーブル参照を抽出"""
+        # SQL文からのテーブル抽出（1 回の走査で全パターンを評価）
+        # 出力順は従来どおり「パターン定義順 → 出現位置順」に揃える
+        buckets: List[List[TableReference]] = [[] for _ in self._SQL_OPS]
+        for k, (table_name,), pos in self._SQL_RE.scan(code):
+            if self._is_valid_table(table_name):
+                buckets[k].append(TableReference(
+                    table_name=table_name,
+                    logical_name=self._get_logical_name(table_name),
+                    operation_type=self._SQL_OPS[k],
+                    source_class=class_name,
+                    source_method=method_name,
+                    source_text=code,
+                    context_pos=pos,
+                ))
+        references = [ref for bucket in buckets for ref in bucket]
         
         # GeneXus特有パターンからの抽出
         references.extend(self._extract_genexus_references(code, class_name, method_name))
@@ -224,56 +528,42 @@ class TableReferenceExtractor:
     def _extract_genexus_references(self, code: str, class_name: str,
                                     method_name: Optional[str]) -> List[TableReference]:
         """GeneXus特有のテーブル参照を抽出"""
-        references = []
+        buckets: List[List[TableReference]] = [[] for _ in self._GX_RE.names]
+        gx_names = self._GX_RE.names
         
         # Business Component参照
-        for pattern_name, pattern in self.GENEXUS_PATTERNS.items():
-            for match in re.finditer(pattern, code):
-                entity_name = match.group(1)
-                table_name = self._guess_table_from_entity(entity_name)
-                
-                if table_name:
-                    op_type = {
-                        'BC_LOAD': 'SELECT',
-                        'BC_SAVE': 'INSERT/UPDATE',
-                        'BC_DELETE': 'DELETE',
-                        'FOR_EACH': 'SELECT',
-                        'SDT_REF': 'REFERENCE',
-                    }.get(pattern_name, 'UNKNOWN')
-                    
-                    references.append(TableReference(
-                        table_name=table_name,
-                        logical_name=self._get_logical_name(table_name),
-                        operation_type=op_type,
-                        source_class=class_name,
-                        source_method=method_name,
-                        context=self._extract_context(code, match.start()),
-                    ))
+        for k, (entity_name,), pos in self._GX_RE.scan(code):
+            table_name = self._guess_table_from_entity(entity_name)
+            
+            if table_name:
+                buckets[k].append(TableReference(
+                    table_name=table_name,
+                    logical_name=self._get_logical_name(table_name),
+                    operation_type=self.GENEXUS_OPERATIONS.get(gx_names[k], 'UNKNOWN'),
+                    source_class=class_name,
+                    source_method=method_name,
+                    source_text=code,
+                    context_pos=pos,
+                ))
         
-        return references
+        return [ref for bucket in buckets for ref in bucket]
     
     def _is_valid_table(self, name: str) -> bool:
         """有効なテーブル名かチェック"""
         # 予約語や一般的な変数名を除外
-        exclude = {'SELECT', 'FROM', 'WHERE', 'AND', 'OR', 'SET', 'INTO', 
-                   'VALUES', 'ORDER', 'GROUP', 'HAVING', 'LIMIT', 'OFFSET',
-                   'NULL', 'TRUE', 'FALSE', 'AS', 'ON', 'IN', 'NOT', 'LIKE'}
-        if name.upper() in exclude:
-            return False
-        return name.upper() in self.table_names or name.lower() in self.table_names
+        upper = name.upper()
+        return upper not in self._EXCLUDE and upper in self.table_names
     
     def _get_logical_name(self, table_name: str) -> str:
         """テーブルの論理名を取得"""
-        return self.table_logical_names.get(table_name.upper(), 
-               self.table_logical_names.get(table_name.lower(), table_name))
+        return self.table_logical_names.get(table_name.upper(), table_name)
     
     def _guess_table_from_entity(self, entity_name: str) -> Optional[str]:
         """エンティティ名からテーブル名を推測"""
         # 直接マッチ
-        if entity_name.upper() in self.table_names:
-            return entity_name.upper()
-        if entity_name.lower() in self.table_names:
-            return entity_name.lower()
+        upper = entity_name.upper()
+        if upper in self.table_names:
+            return upper
         
         # プレフィックス除去してマッチ
         for prefix in ['sdt_', 'type_', 'bc_', 'trn_']:
@@ -283,31 +573,172 @@ class TableReferenceExtractor:
                     return base_name.upper()
         
         return None
-    
-    def _extract_context(self, code: str, position: int, context_length: int = 100) -> str:
-        """参照箇所の前後コンテキストを抽出"""
-        start = max(0, position - context_length // 2)
-        end = min(len(code), position + context_length // 2)
-        return code[start:end].replace('\n', ' ').strip()
+
+
+# ---------- 入力読み込み ----------
+
+# java_structure で保持するキー（imports / annotations など解析に使わないものは読み捨てる）
+_JAVA_FILE_KEYS = ('file', 'path', 'package', 'function_type')
+_JAVA_CLASS_KEYS = ('name', 'full_name', 'package', 'function_type', 'genexus_type')
+_JAVA_METHOD_KEYS = ('name', 'param_count', 'start_line', 'code', 'signature', 'sql_strings', 'calls')
+# 値の種類が少なく全クラスで繰り返されるキー（sys.intern で 1 つの文字列を共有する）
+_JAVA_INTERNED_KEYS = ('function_type', 'genexus_type')
+
+
+def _intern_values(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """_JAVA_INTERNED_KEYS の文字列値を intern する（その場で書き換えて返す）"""
+    for key in _JAVA_INTERNED_KEYS:
+        value = entry.get(key)
+        if isinstance(value, str):
+            entry[key] = sys.intern(value)
+    return entry
+
+
+def _slim_file_entry(file_entry: Dict[str, Any]) -> Dict[str, Any]:
+    """ファイルエントリから解析に使うキーだけを残したコピーを作る"""
+    classes = []
+    for cls in file_entry.get('classes', []) or []:
+        slim_cls = _intern_values({key: cls[key] for key in _JAVA_CLASS_KEYS if key in cls})
+        type_refs = (cls.get('dependencies') or {}).get('type_references')
+        if type_refs:
+            slim_cls['dependencies'] = {'type_references': type_refs}
+        slim_cls['methods'] = [
+            {key: m[key] for key in _JAVA_METHOD_KEYS if key in m}
+            for m in cls.get('methods', []) or []
+        ]
+        classes.append(slim_cls)
+    slim_entry = _intern_values({key: file_entry[key] for key in _JAVA_FILE_KEYS if key in file_entry})
+    slim_entry['classes'] = classes
+    return slim_entry
+
+
+def _load_json_file(path: Path) -> Any:
+    """JSONファイルを読み込む（str へのデコードを挟まずバイト列のまま解析）"""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with path.open('rb') as f:
+        return json.load(f)  # UTF-8 のバイト列を直接受け付ける
+
+
+def _load_java_structure(path: Path) -> Dict[str, Any]:
+    """Java構造JSONを読み込む
+
+    ijson がインストールされていれば files を 1 件ずつストリーム処理し、
+    ファイル全体の辞書をメモリに展開しない。索引は restore_design でも使う files の一覧から
+    構築するので、解析に使うキーだけに絞った files 全体は保持する（索引の逐次構築はしない）。
+    """
+    if ijson is None:
+        structure = _load_json_file(path)
+        structure['files'] = [_slim_file_entry(fe) for fe in structure.get('files', []) or []]
+        return structure
+
+    structure: Dict[str, Any] = {}
+
+    def events(f):
+        # files 以外で参照するのは project_root と call_graph の上限値のみ（スカラーなので通過するイベントから拾う）
+        for prefix, event, value in ijson.parse(f):
+            if prefix == 'project_root' and event == 'string':
+                structure['project_root'] = value
+            elif prefix in ('call_graph.max_depth', 'call_graph.max_nodes') and event == 'number':
+                structure.setdefault('call_graph', {})[prefix[len('call_graph.'):]] = value
+            yield prefix, event, value
+
+    # 1 回の走査で files を 1 件ずつ組み立てつつスカラーも拾う（items はイベント列を最後まで読む）
+    with path.open('rb') as f:
+        structure['files'] = [_slim_file_entry(fe) for fe in ijson.items(events(f), 'files.item')]
+    return structure
 
 
 # ---------- 機能設計還元 ----------
 
+# GeneXusオブジェクト種別 → 機能名サフィックス（_infer_function_name 用）
+_GENEXUS_SUFFIX = {
+    'WebPanel': '画面',
+    'Transaction': '登録画面',
+    'WorkWithPlus': '一覧画面',
+    'Procedure': '処理',
+    'DataProvider': 'データ取得',
+    'Report': '帳票',
+}
+
+# 操作種別の語 → CRUD ビット（_build_crud_matrix 用）
+_CRUD_OP_BITS = {'INSERT': 1, 'SELECT': 2, 'READ': 2, 'UPDATE': 4, 'DELETE': 8}
+# (CRUD マトリックスのキー, ビット)。マトリックスのキー順
+_CRUD_KINDS = (('CREATE', 1), ('READ', 2), ('UPDATE', 4), ('DELETE', 8))
+# (CRUD マトリックスのキー, 説明文のラベル)。_generate_description 用
+_CRUD_LABELS = (('CREATE', '登録'), ('READ', '参照'), ('UPDATE', '更新'), ('DELETE', '削除'))
+
+# クラス名の先頭単語（例: "OrderEdit" -> "Order"）。_extract_prefix 用
+_PREFIX_RE = re.compile(r'^([A-Z]?[a-z]+)')
+
+# クラス名キーワード → 日本語名（_class_name_to_japanese 用。出力はこの定義順）
+_CLASS_NAME_KEYWORDS: Tuple[Tuple[str, str], ...] = tuple({
+    'list': '一覧', 'detail': '詳細', 'edit': '編集', 'entry': '登録',
+    'search': '検索', 'inquiry': '照会', 'inq': '照会',
+    'report': '帳票', 'rpt': '帳票', 'print': '印刷',
+    'export': 'エクスポート', 'import': 'インポート',
+    'batch': 'バッチ', 'proc': '処理', 'calc': '計算',
+    'order': '受注', 'ord': '受注', 'purchase': '発注', 'po': '発注',
+    'customer': '得意先', 'cust': '得意先', 'supplier': '仕入先', 'sup': '仕入先',
+    'product': '商品', 'prd': '商品', 'item': '品目', 'itm': '品目',
+    'inventory': '在庫', 'inv': '在庫', 'stock': '在庫', 'stk': '在庫',
+    'user': 'ユーザー', 'usr': 'ユーザー', 'employee': '従業員', 'emp': '従業員',
+    'master': 'マスタ', 'mst': 'マスタ', 'maintenance': 'メンテナンス',
+    'home': 'ホーム', 'menu': 'メニュー', 'login': 'ログイン',
+}.items())
+
+_CLASS_NAME_KEYWORD_AUTOMATON = None
+if ahocorasick is not None:
+    _CLASS_NAME_KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _order, (_key, _) in enumerate(_CLASS_NAME_KEYWORDS):
+        _CLASS_NAME_KEYWORD_AUTOMATON.add_word(_key, _order)
+    _CLASS_NAME_KEYWORD_AUTOMATON.make_automaton()
+
+
 class FunctionDesignRestorer:
     """機能設計を還元"""
     
-    def __init__(self, java_structure: Dict[str, Any], db_metadata: Dict[str, Any]):
+    # メソッド単位キャッシュ（参照・使用カラム）の既定の上限件数
+    DEFAULT_CACHE_SIZE = 20000
+
+    def __init__(self, java_structure: Dict[str, Any], db_metadata: Dict[str, Any],
+                 cache_size: int = DEFAULT_CACHE_SIZE):
         self.java_structure = java_structure
         self.db_metadata = db_metadata
         self.extractor = TableReferenceExtractor(db_metadata)
         self.table_info = self._build_table_info()
+        # テーブル(大文字) → カラム名の結合正規表現（pyahocorasick 未インストール時のカラム照合用）
+        self._table_col_regex: Dict[str, re.Pattern] = self._build_table_column_regexes()
 
         # Build a static call graph index so we can resolve "screen -> other" DB access.
         self._call_max_depth = int(java_structure.get('call_graph', {}).get('max_depth', 8)) if isinstance(java_structure, dict) else 8
         self._call_max_nodes = int(java_structure.get('call_graph', {}).get('max_nodes', 800)) if isinstance(java_structure, dict) else 800
         self._method_index, self._class_index = self._build_call_graph_indexes()
-        self._method_refs_cache: Dict[str, List[TableReference]] = {}
-        self._method_columns_cache: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+
+        # Fast lookup indexes for call resolution (lists keep method_index / class_index order)
+        self._methods_by_class_and_name: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        self._methods_by_name: Dict[str, List[str]] = defaultdict(list)
+        self._class_fulls_by_class_name: Dict[str, List[str]] = defaultdict(list)
+        self._class_order: Dict[str, int] = {}
+        for mid, rec in self._method_index.items():
+            self._methods_by_class_and_name[(rec['class_full'], rec['method_name'])].append(mid)
+            self._methods_by_name[rec['method_name']].append(mid)
+        for order, (cfull, crec) in enumerate(self._class_index.items()):
+            self._class_fulls_by_class_name[crec['class_name']].append(cfull)
+            self._class_order[cfull] = order
+        # (caller_class_full, name, arg_count, qualifier) -> candidate method ids
+        self._resolve_cache: Dict[Tuple[str, str, int, Optional[str]], List[str]] = {}
+        # method_id -> callee method ids in call order (static edges, resolved once per method)
+        self._call_edges_cache: Dict[str, List[str]] = {}
+        # クラス名 → 日本語名 / グループ化プレフィックス（純粋な文字列変換なので結果を使い回す）
+        self._japanese_name_cache: Dict[str, str] = {}
+        self._prefix_cache: Dict[str, str] = {}
+        # method_id -> 参照 / 使用カラム（上限付き。常に同じ順で読み書きするので両者の追い出し順は揃う）
+        self._cache_size = cache_size
+        self._method_refs_cache = _LRUCache(cache_size)
+        self._method_columns_cache = _LRUCache(cache_size)
+        # クラス単位の解析を並列実行するプロセス数（1 なら逐次実行）
+        self._jobs: int = 1
 
         # ---- progress / stats ----
         # You can override these from CLI (see main) or by setting attributes directly.
@@ -321,6 +752,13 @@ class FunctionDesignRestorer:
         self._stats: Dict[str, int] = defaultdict(int)
         self._stats_unique_tables: Set[str] = set()
 
+    @classmethod
+    def from_paths(cls, java_path: Path, db_path: Path, **kwargs: Any) -> 'FunctionDesignRestorer':
+        """JSONファイルから生成（Java構造は _load_java_structure で読み込む。kwargs は __init__ へ渡す）"""
+        java_structure = _load_java_structure(Path(java_path))
+        db_metadata = _load_json_file(Path(db_path))
+        return cls(java_structure, db_metadata, **kwargs)
+
     def _fmt_elapsed(self, start_ts: float) -> str:
         try:
             return f"{time.monotonic() - start_ts:.1f}s"
@@ -339,13 +777,45 @@ class FunctionDesignRestorer:
             self._progress_last_ts = now
 
     def _build_table_info(self) -> Dict[str, Dict[str, Any]]:
-        """テーブル情報辞書を構築"""
+        """テーブル情報辞書を構築（派生データは db_metadata を書き換えず浅いコピーに載せる）"""
         info = {}
         for table in self.db_metadata.get('tables', []):
-            info[table['table_name'].upper()] = table
-            info[table['table_name'].lower()] = table
+            entry = {
+                **table,
+                # 使用カラム推定用に名前の小文字化を済ませたカラム一覧（メソッド毎の再計算を避ける）
+                '_prepared_columns': _prepare_columns(table.get('columns', []) or []),
+            }
+            info[table['table_name'].upper()] = entry
+            info[table['table_name'].lower()] = entry
         return info
 
+    def _build_table_column_regexes(self) -> Dict[str, re.Pattern]:
+        """テーブルごとに全カラム名を 1 つの選択パターンへまとめてコンパイル"""
+        regexes: Dict[str, re.Pattern] = {}
+        for table in self.db_metadata.get('tables', []):
+            key = table['table_name'].upper()
+            names = dict.fromkeys(re.escape(name) for name, _, _ in self.table_info[key]['_prepared_columns'])
+            if names:
+                regexes[key] = re.compile(
+                    r"\b(" + "|".join(names) + r")\b", re.IGNORECASE
+                )
+        return regexes
+
+    def _columns_used_by_table(self, text: str, table_key: str,
+                               found: Optional[Set[str]]) -> List[Dict[str, Any]]:
+        """テキスト中で使われているテーブルのカラムを抽出
+
+        found は extractor.find_column_names の結果。None の場合は
+        テーブルの結合正規表現で 1 回だけ走査して代用する。
+        """
+        cols = self.table_info.get(table_key, {}).get('_prepared_columns')
+        if not cols or not text:
+            return []
+        if found is None:
+            rx = self._table_col_regex.get(table_key)
+            found = {m.group(1).lower() for m in rx.finditer(text)} if rx is not None else set()
+        return _extract_used_columns(text, cols, found)
+
     def _build_call_graph_indexes(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
         """Build method/class indexes for call graph resolution.
 
@@ -366,8 +836,10 @@ class FunctionDesignRestorer:
 
         for file_entry in self.java_structure.get('files', []):
             for cls in file_entry.get('classes', []):
-                class_name = cls.get('name', '')
-                class_full = cls.get('full_name') or (f"{cls.get('package')}.{class_name}" if cls.get('package') else class_name)
+                # Names repeat in every method record / index key: intern them so the
+                # copies share one object and dict lookups compare by identity first.
+                class_name = sys.intern(cls.get('name', ''))
+                class_full = sys.intern(cls.get('full_name') or (f"{cls.get('package')}.{class_name}" if cls.get('package') else class_name))
                 deps = cls.get('dependencies') or {}
                 type_refs = deps.get('type_references') or []
 
@@ -380,7 +852,7 @@ class FunctionDesignRestorer:
                 }
 
                 for m in cls.get('methods', []) or []:
-                    mname = m.get('name') or ''
+                    mname = sys.intern(m.get('name') or '')
                     if not mname:
                         continue
                     param_count = m.get('param_count', -1)
@@ -420,18 +892,18 @@ class FunctionDesignRestorer:
             arg_count = -1
         qualifier = _simplify_qualifier(call.get('qualifier'))
 
+        cache_key = (caller_class_full, name, arg_count, qualifier)
+        cached = self._resolve_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        def accepts(mid: str) -> bool:
+            return arg_count < 0 or self._method_index[mid]['param_count'] in (arg_count, -1)
+
         # Helper to pick methods in a class
         def pick_in_class(class_full: str) -> List[str]:
-            out: List[str] = []
-            for mid, rec in self._method_index.items():
-                if rec.get('class_full') != class_full:
-                    continue
-                if rec.get('method_name') != name:
-                    continue
-                if arg_count >= 0 and rec.get('param_count') not in (arg_count, -1):
-                    continue
-                out.append(mid)
-            return out
+            mids = self._methods_by_class_and_name.get((class_full, name)) or []
+            return [mid for mid in mids if accepts(mid)]
 
         cands: List[str] = []
 
@@ -441,38 +913,44 @@ class FunctionDesignRestorer:
 
         # 2) Qualified by a class-like name (static call)
         if qualifier and _looks_like_class_name(qualifier):
-            for cls_full, cls_info in self._class_index.items():
-                if cls_info.get('class_name') == qualifier:
-                    cands.extend(pick_in_class(cls_full))
+            for cls_full in self._class_fulls_by_class_name.get(qualifier) or []:
+                cands.extend(pick_in_class(cls_full))
 
         # 3) If still empty, try restricting to caller's referenced types
         if not cands:
             type_refs = set((self._class_index.get(caller_class_full) or {}).get('type_references') or [])
             if type_refs:
-                for cls_full, cls_info in self._class_index.items():
-                    if cls_info.get('class_name') in type_refs:
-                        cands.extend(pick_in_class(cls_full))
+                cls_fulls = [cf for cname in type_refs for cf in self._class_fulls_by_class_name.get(cname) or []]
+                for cls_full in sorted(cls_fulls, key=self._class_order.__getitem__):
+                    cands.extend(pick_in_class(cls_full))
 
         # 4) Global fallback (cap)
         if not cands:
-            for mid, rec in self._method_index.items():
-                if rec.get('method_name') != name:
-                    continue
-                if arg_count >= 0 and rec.get('param_count') not in (arg_count, -1):
+            for mid in self._methods_by_name.get(name) or []:
+                if not accepts(mid):
                     continue
                 cands.append(mid)
                 if len(cands) >= 20:
                     break
 
-        # Deduplicate
-        seen = set()
-        uniq: List[str] = []
-        for c in cands:
-            if c not in seen:
-                seen.add(c)
-                uniq.append(c)
+        # Deduplicate (order-preserving)
+        uniq: List[str] = list(dict.fromkeys(cands))
+        self._resolve_cache[cache_key] = uniq
         return uniq
 
+    def _call_edges(self, mid: str, rec: Dict[str, Any]) -> List[str]:
+        """Callee candidates of a method, for all of its calls (resolved on first use, then reused)."""
+        edges = self._call_edges_cache.get(mid)
+        if edges is None:
+            caller_class_full = rec.get('class_full') or ''
+            edges = [
+                cmid
+                for call in rec.get('calls') or []
+                for cmid in self._resolve_call_candidates(caller_class_full, call)
+            ]
+            self._call_edges_cache[mid] = edges
+        return edges
+
     def _collect_references_for_class(self, cls_data: Dict[str, Any]) -> Tuple[List[TableReference], Dict[str, List[Dict[str, Any]]], Set[str]]:
         """Collect table references by traversing the call graph starting from a class' methods.
 
@@ -501,19 +979,21 @@ class FunctionDesignRestorer:
                     method_code = method_code + "\n" + "\n".join(sql_strings)
                 refs = self.extractor.extract_from_code(method_code, class_name, m.get('name'))
                 all_references.extend(refs)
-                for r in refs:
-                    tinfo = self.table_info.get(r.table_name.upper(), {})
-                    cols = tinfo.get('columns', [])
-                    cols_used = _extract_used_columns(method_code, cols)
+                found = self.extractor.find_column_names(method_code) if refs else None
+                # one pass per referenced table (a method often references the same table many times)
+                for table_key in dict.fromkeys(r.table_name.upper() for r in refs):
+                    cols_used = self._columns_used_by_table(method_code, table_key, found)
                     if cols_used:
-                        columns_used_map[r.table_name.upper()] = cols_used
+                        columns_used_map[table_key] = cols_used
             return all_references, columns_used_map, set()
 
         # Call graph traversal
         visited: Set[str] = set()
-        queue: List[Tuple[str, int]] = [(mid, 0) for mid in entry_method_ids]
+        queue: deque = deque((mid, 0) for mid in entry_method_ids)
         all_refs: List[TableReference] = []
         columns_used_map: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        # column names already merged into columns_used_map, per table
+        seen_cols: Dict[str, Set[Optional[str]]] = defaultdict(set)
         related_classes: Set[str] = set()
 
         # per-class call-graph progress
@@ -522,71 +1002,83 @@ class FunctionDesignRestorer:
         cache_hits = 0
         unique_tables: Set[str] = set()
 
-        while queue and len(visited) < self._call_max_nodes:
-            mid, depth = queue.pop(0)
+        # Hot loop: bind attributes / bound methods to locals once
+        max_nodes = self._call_max_nodes
+        max_depth = self._call_max_depth
+        progress_every = self._progress_call_every
+        method_index = self._method_index
+        class_index = self._class_index
+        refs_cache = self._method_refs_cache
+        columns_cache = self._method_columns_cache
+        stats = self._stats
+        stats_unique_tables = self._stats_unique_tables
+        extract_from_code = self.extractor.extract_from_code
+        find_column_names = self.extractor.find_column_names
+        columns_used_by_table = self._columns_used_by_table
+        call_edges = self._call_edges
+
+        while queue and len(visited) < max_nodes:
+            mid, depth = queue.popleft()
             if mid in visited:
                 continue
             visited.add(mid)
 
             # Stats
-            self._stats['methods_visited'] = self._stats.get('methods_visited', 0) + 1
+            stats['methods_visited'] += 1
 
-            rec = self._method_index.get(mid) or {}
+            rec = method_index.get(mid) or {}
             text = rec.get('text') or ''
             src_class = rec.get('class_name') or class_name
             src_method = rec.get('method_name')
 
             # Extract refs (cached)
-            if mid in self._method_refs_cache:
-                refs = self._method_refs_cache[mid]
-                cols_map = self._method_columns_cache.get(mid) or {}
+            refs = refs_cache.get(mid)
+            if refs is not None:
+                cols_map = columns_cache.get(mid) or {}
                 cache_hits += 1
-                self._stats['cache_hits'] = self._stats.get('cache_hits', 0) + 1
+                stats['cache_hits'] += 1
             else:
-                refs = self.extractor.extract_from_code(text, src_class, src_method)
+                refs = extract_from_code(text, src_class, src_method)
                 cols_map: Dict[str, List[Dict[str, Any]]] = {}
                 # columns used (heuristic) per table
-                for r in refs:
-                    tinfo = self.table_info.get(r.table_name.upper(), {})
-                    cols = tinfo.get('columns', [])
-                    cols_used = _extract_used_columns(text, cols)
+                found = find_column_names(text) if refs else None
+                for table_key in dict.fromkeys(r.table_name.upper() for r in refs):
+                    cols_used = columns_used_by_table(text, table_key, found)
                     if cols_used:
-                        cols_map[r.table_name.upper()] = cols_used
-                self._method_refs_cache[mid] = refs
-                self._method_columns_cache[mid] = cols_map
+                        cols_map[table_key] = cols_used
+                refs_cache[mid] = refs
+                columns_cache[mid] = cols_map
             all_refs.extend(refs)
             refs_total += len(refs)
-            self._stats['table_refs'] = self._stats.get('table_refs', 0) + len(refs)
+            stats['table_refs'] += len(refs)
             for r in refs:
                 tn = (r.table_name or '').upper()
                 if tn:
                     unique_tables.add(tn)
-                    self._stats_unique_tables.add(tn)
+                    stats_unique_tables.add(tn)
 
             # Periodic call-graph progress
-            if self._progress_call_every > 0 and len(visited) % self._progress_call_every == 0:
+            if progress_every > 0 and len(visited) % progress_every == 0:
                 self._progress(
-                    f"[進捗] callgraph {class_name}: visited={len(visited)}/{self._call_max_nodes} queue={len(queue)} depth={depth}/{self._call_max_depth} refs={refs_total} unique_tables={len(unique_tables)} cache_hits={cache_hits} elapsed={self._fmt_elapsed(cg_start_ts)}"
+                    f"[進捗] callgraph {class_name}: visited={len(visited)}/{max_nodes} queue={len(queue)} depth={depth}/{max_depth} refs={refs_total} unique_tables={len(unique_tables)} cache_hits={cache_hits} elapsed={self._fmt_elapsed(cg_start_ts)}"
                 )
             for t, cols in (cols_map or {}).items():
                 # merge unique column dicts by name
-                existing = {c.get('name') for c in columns_used_map.get(t, [])}
+                existing = seen_cols[t]
                 for c in cols:
                     if c.get('name') not in existing:
                         columns_used_map[t].append(c)
                         existing.add(c.get('name'))
 
             # Follow calls
-            if depth >= self._call_max_depth:
+            if depth >= max_depth:
                 continue
-            for call in rec.get('calls') or []:
-                cands = self._resolve_call_candidates(rec.get('class_full') or class_full, call)
-                for cmid in cands:
-                    if cmid not in visited:
-                        queue.append((cmid, depth + 1))
-                        callee_cls_full = (self._method_index.get(cmid) or {}).get('class_full')
-                        if callee_cls_full and callee_cls_full != class_full:
-                            related_classes.add((self._class_index.get(callee_cls_full) or {}).get('class_name', callee_cls_full))
+            for cmid in call_edges(mid, rec):
+                if cmid not in visited:
+                    queue.append((cmid, depth + 1))
+                    callee_cls_full = (method_index.get(cmid) or {}).get('class_full')
+                    if callee_cls_full and callee_cls_full != class_full:
+                        related_classes.add((class_index.get(callee_cls_full) or {}).get('class_name', callee_cls_full))
 
         self._progress(
             f"[進捗] callgraph done {class_name}: visited={len(visited)} refs={refs_total} unique_tables={len(unique_tables)} related_classes={len(related_classes)} cache_hits={cache_hits} elapsed={self._fmt_elapsed(cg_start_ts)}",
@@ -602,30 +1094,33 @@ class FunctionDesignRestorer:
         table_function_map = defaultdict(list)
 
         # 対象クラス（screen/batch）の総数を事前集計して進捗を出す
-        target_classes: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
-        for fe in self.java_structure.get('files', []):
-            for cd in fe.get('classes', []) or []:
+        # (files の添字, classes の添字)。並列実行時はこの添字だけをワーカーへ渡す
+        files = self.java_structure.get('files', [])
+        target_classes: List[Tuple[int, int]] = []
+        for fi, fe in enumerate(files):
+            for ci, cd in enumerate(fe.get('classes', []) or []):
                 ft = cd.get('function_type', 'other')
                 if ft in ('screen', 'batch'):
-                    target_classes.append((fe, cd))
+                    target_classes.append((fi, ci))
 
         total_targets = len(target_classes)
         self._progress(f"[進捗] 解析開始: 対象クラス(screen/batch)={total_targets} / call_depth={self._call_max_depth} / call_nodes={self._call_max_nodes}", force=True)
 
         processed = 0
 
-        # ファイルごとに解析
-        for file_entry, cls_data in target_classes:
-            for cls_data in file_entry.get('classes', []):
-                func_type = cls_data.get('function_type', 'other')
-                if func_type in ('screen', 'batch'):
-                    func_design = self._restore_function(cls_data, file_entry)
-                    if func_design:
-                        functions.append(func_design)
-                        
-                        # テーブル-機能マッピング更新
-                        for table in func_design.tables_used:
-                            table_function_map[table['table_name']].append(func_design.function_id)
+        # 対象クラスごとに解析
+        if self._jobs > 1 and total_targets > 1:
+            results = self._restore_functions_parallel(target_classes)
+        else:
+            results = (self._restore_function(files[fi]['classes'][ci], files[fi]) for fi, ci in target_classes)
+
+        for func_design in results:
+            if func_design:
+                functions.append(func_design)
+                
+                # テーブル-機能マッピング更新
+                for table in func_design.tables_used:
+                    table_function_map[table['table_name']].append(func_design.function_id)
         
         self._progress(
             f"[進捗] 解析完了: functions={len(functions)} methods_visited={self._stats.get('methods_visited',0)} cache_hits={self._stats.get('cache_hits',0)} refs={self._stats.get('table_refs',0)} unique_tables={len(self._stats_unique_tables)} elapsed={self._fmt_elapsed(start_ts)}",
@@ -642,6 +1137,29 @@ class FunctionDesignRestorer:
             er_diagram_data=self._build_er_data(),
         )
     
+    def _restore_functions_parallel(self, work: List[Tuple[int, int]]) -> Iterator[Optional[FunctionDesign]]:
+        """クラス単位の還元をプロセス並列で実行（結果は work の順に返す）
+
+        各ワーカーは初期化時に 1 回だけ自前の FunctionDesignRestorer（索引・キャッシュ）を構築し、
+        以降は (files の添字, classes の添字) だけを受け取る。統計はワーカーの差分を合算する。
+        ワーカー内のコールグラフ進捗ログは出力しない。
+        """
+        settings = {
+            '_call_max_depth': self._call_max_depth,
+            '_call_max_nodes': self._call_max_nodes,
+        }
+        chunksize = max(1, len(work) // (self._jobs * 4))
+        with ProcessPoolExecutor(
+            max_workers=self._jobs,
+            initializer=_init_restore_worker,
+            initargs=(self.java_structure, self.db_metadata, self._cache_size, settings),
+        ) as executor:
+            for func_design, stats, unique_tables in executor.map(_restore_function_in_worker, work, chunksize=chunksize):
+                for key, value in stats.items():
+                    self._stats[key] += value
+                self._stats_unique_tables |= unique_tables
+                yield func_design
+
     def _restore_function(self, cls_data: Dict[str, Any], 
                           file_entry: Dict[str, Any]) -> Optional[FunctionDesign]:
         """単一機能の設計を還元"""
@@ -696,7 +1214,7 @@ class FunctionDesignRestorer:
                             'data_type': col.get('data_type'),
                             'is_primary_key': col.get('is_primary_key', False),
                         }
-                        for col in table_info.get('columns', [])[:10]  # 主要カラムのみ
+                        for col in islice(table_info.get('columns', ()), 10)  # 主要カラムのみ
                     ],
                 }
             table_map[key]['operations'].add(ref.operation_type)
@@ -719,26 +1237,28 @@ class FunctionDesignRestorer:
     
     def _build_crud_matrix(self, references: List[TableReference]) -> Dict[str, List[str]]:
         """CRUD操作マトリックスを構築"""
-        matrix = {'CREATE': [], 'READ': [], 'UPDATE': [], 'DELETE': []}
+        # 重複を含めて出現順に追加し、最後に dict.fromkeys で順序を保ったまま重複を除く
+        raw = {'CREATE': [], 'READ': [], 'UPDATE': [], 'DELETE': []}
+        
+        # 操作種別 → CRUD ビット（操作種別の種類は少ないので 1 回だけ分解する）
+        op_bits: Dict[str, int] = {}
         
         for ref in references:
             table_name = ref.table_name.upper()
-            op = ref.operation_type.upper()
+            op = ref.operation_type
+            bits = op_bits.get(op)
+            if bits is None:
+                # 操作種別は 'SELECT' や 'INSERT/UPDATE' の形式なので語に分けて判定
+                bits = 0
+                for token in op.upper().replace('/', ' ').split():
+                    bits |= _CRUD_OP_BITS.get(token, 0)
+                op_bits[op] = bits
             
-            if 'INSERT' in op:
-                if table_name not in matrix['CREATE']:
-                    matrix['CREATE'].append(table_name)
-            if 'SELECT' in op or 'READ' in op:
-                if table_name not in matrix['READ']:
-                    matrix['READ'].append(table_name)
-            if 'UPDATE' in op:
-                if table_name not in matrix['UPDATE']:
-                    matrix['UPDATE'].append(table_name)
-            if 'DELETE' in op:
-                if table_name not in matrix['DELETE']:
-                    matrix['DELETE'].append(table_name)
+            for kind, bit in _CRUD_KINDS:
+                if bits & bit:
+                    raw[kind].append(table_name)
         
-        return matrix
+        return {kind: list(dict.fromkeys(names)) for kind, names in raw.items()}
     
     def _infer_function_name(self, class_name: str, tables_used: List[Dict],
                              genexus_type: Optional[str]) -> str:
@@ -749,14 +1269,7 @@ class FunctionDesignRestorer:
             table_logical = main_table.get('logical_name', '')
             
             if genexus_type:
-                type_suffix = {
-                    'WebPanel': '画面',
-                    'Transaction': '登録画面',
-                    'WorkWithPlus': '一覧画面',
-                    'Procedure': '処理',
-                    'DataProvider': 'データ取得',
-                    'Report': '帳票',
-                }.get(genexus_type, '')
+                type_suffix = _GENEXUS_SUFFIX.get(genexus_type, '')
                 
                 if table_logical and table_logical != main_table['table_name']:
                     return f"{table_logical}{type_suffix}"
@@ -766,28 +1279,22 @@ class FunctionDesignRestorer:
     
     def _class_name_to_japanese(self, class_name: str) -> str:
         """クラス名から日本語名を推測"""
-        # プレフィックス/サフィックスマッピング
-        keywords = {
-            'list': '一覧', 'detail': '詳細', 'edit': '編集', 'entry': '登録',
-            'search': '検索', 'inquiry': '照会', 'inq': '照会',
-            'report': '帳票', 'rpt': '帳票', 'print': '印刷',
-            'export': 'エクスポート', 'import': 'インポート',
-            'batch': 'バッチ', 'proc': '処理', 'calc': '計算',
-            'order': '受注', 'ord': '受注', 'purchase': '発注', 'po': '発注',
-            'customer': '得意先', 'cust': '得意先', 'supplier': '仕入先', 'sup': '仕入先',
-            'product': '商品', 'prd': '商品', 'item': '品目', 'itm': '品目',
-            'inventory': '在庫', 'inv': '在庫', 'stock': '在庫', 'stk': '在庫',
-            'user': 'ユーザー', 'usr': 'ユーザー', 'employee': '従業員', 'emp': '従業員',
-            'master': 'マスタ', 'mst': 'マスタ', 'maintenance': 'メンテナンス',
-            'home': 'ホーム', 'menu': 'メニュー', 'login': 'ログイン',
-        }
-        
+        cached = self._japanese_name_cache.get(class_name)
+        if cached is not None:
+            return cached
+        name = self._japanese_name_cache[class_name] = self._class_name_to_japanese_uncached(class_name)
+        return name
+
+    @staticmethod
+    def _class_name_to_japanese_uncached(class_name: str) -> str:
+        """_class_name_to_japanese の本体（キャッシュなし）"""
         name_lower = class_name.lower()
-        parts = []
-        
-        for key, value in keywords.items():
-            if key in name_lower:
-                parts.append(value)
+        if _CLASS_NAME_KEYWORD_AUTOMATON is not None:
+            # 1 回の走査で全キーワードの出現（重なりを含む）を拾い、定義順に並べる
+            found = {order for _, order in _CLASS_NAME_KEYWORD_AUTOMATON.iter(name_lower)}
+            parts = [_CLASS_NAME_KEYWORDS[order][1] for order in sorted(found)]
+        else:
+            parts = [value for key, value in _CLASS_NAME_KEYWORDS if key in name_lower]
         
         if parts:
             return ''.join(parts)
@@ -797,55 +1304,56 @@ class FunctionDesignRestorer:
     def _generate_description(self, class_name: str, tables_used: List[Dict],
                               crud_matrix: Dict[str, List[str]]) -> str:
         """機能説明を生成"""
-        desc_parts = []
+        # 操作内容（定義順に 1 つのジェネレータで判定）
+        ops = '/'.join(label for op, label in _CRUD_LABELS if crud_matrix[op])
         
         # 使用テーブル
         if tables_used:
-            table_names = [t['logical_name'] for t in tables_used[:3]]
-            desc_parts.append(f"対象テーブル: {', '.join(table_names)}")
-        
-        # 操作内容
-        ops = []
-        if crud_matrix['CREATE']:
-            ops.append('登録')
-        if crud_matrix['READ']:
-            ops.append('参照')
-        if crud_matrix['UPDATE']:
-            ops.append('更新')
-        if crud_matrix['DELETE']:
-            ops.append('削除')
-        
-        if ops:
-            desc_parts.append(f"操作: {'/'.join(ops)}")
-        
-        return ' | '.join(desc_parts)
+            tables = ', '.join(t['logical_name'] for t in tables_used[:3])
+            if ops:
+                return f"対象テーブル: {tables} | 操作: {ops}"
+            return f"対象テーブル: {tables}"
+        return f"操作: {ops}" if ops else ''
     
     def _group_functions(self, functions: List[FunctionDesign]) -> List[FunctionDesign]:
         """関連機能をグループ化"""
         # プレフィックスでグループ化
-        groups = defaultdict(list)
+        groups: Dict[str, List[FunctionDesign]] = {}
         
         for func in functions:
-            prefix = self._extract_prefix(func.function_id)
-            groups[prefix].append(func)
+            groups.setdefault(self._extract_prefix(func.function_id), []).append(func)
         
         # グループ内で関連クラスを設定
         for prefix, group_funcs in groups.items():
             if len(group_funcs) > 1:
-                for func in group_funcs:
-                    func.related_classes = [
-                        f.function_id for f in group_funcs 
-                        if f.function_id != func.function_id
-                    ]
+                ids = [f.function_id for f in group_funcs]
+                if len(set(ids)) == len(ids):
+                    # ID が一意なら「自分以外」はスライスの連結で作れる
+                    for i, func in enumerate(group_funcs):
+                        func.related_classes = ids[:i] + ids[i + 1:]
+                else:
+                    # 同名クラスがある場合は同じ ID をすべて除く（従来どおり）
+                    for func in group_funcs:
+                        own_id = func.function_id
+                        func.related_classes = [fid for fid in ids if fid != own_id]
         
         return functions
     
     def _extract_prefix(self, class_name: str) -> str:
         """クラス名からプレフィックスを抽出"""
+        cached = self._prefix_cache.get(class_name)
+        if cached is not None:
+            return cached
+        prefix = self._prefix_cache[class_name] = self._extract_prefix_uncached(class_name)
+        return prefix
+
+    @staticmethod
+    def _extract_prefix_uncached(class_name: str) -> str:
+        """_extract_prefix の本体（キャッシュなし）"""
         if '_' in class_name:
             return class_name.split('_')[0].lower()
         
-        match = re.match(r'^([A-Z]?[a-z]+)', class_name)
+        match = _PREFIX_RE.match(class_name)
         if match:
             return match.group(1).lower()
         
@@ -853,11 +1361,9 @@ class FunctionDesignRestorer:
     
     def _build_er_data(self) -> Dict[str, Any]:
         """ER図データを構築"""
-        tables = []
-        relationships = []
-        
-        for table in self.db_metadata.get('tables', []):
-            tables.append({
+        # カラム毎の dict は内包表記の中でリテラルとして直接組み立てる（カラム毎の関数呼び出しを避ける）
+        tables = [
+            {
                 'name': table['table_name'],
                 'logical_name': table.get('logical_name', table['table_name']),
                 'columns': [
@@ -868,34 +1374,78 @@ class FunctionDesignRestorer:
                         'pk': col.get('is_primary_key', False),
                         'fk': col.get('is_foreign_key', False),
                     }
-                    for col in table.get('columns', [])
+                    for col in table.get('columns', ())
                 ],
-            })
-        
-        for fk in self.db_metadata.get('foreign_keys', []):
-            relationships.append({
+            }
+            for table in self.db_metadata.get('tables', ())
+        ]
+
+        relationships = [
+            {
                 'from_table': fk['from_table'],
                 'to_table': fk['to_table'],
                 'from_columns': fk['from_columns'],
                 'to_columns': fk['to_columns'],
                 'type': 'many-to-one',  # 簡略化
-            })
-        
+            }
+            for fk in self.db_metadata.get('foreign_keys', ())
+        ]
+
         return {
             'tables': tables,
             'relationships': relationships,
         }
 
 
+# ---------- 並列実行（ProcessPoolExecutor のワーカー） ----------
+
+_WORKER_RESTORER: Optional[FunctionDesignRestorer] = None
+
+
+def _init_restore_worker(java_structure: Dict[str, Any], db_metadata: Dict[str, Any],
+                         cache_size: int, settings: Dict[str, Any]) -> None:
+    """ワーカープロセスの初期化: 索引を 1 回だけ構築して使い回す"""
+    global _WORKER_RESTORER
+    restorer = FunctionDesignRestorer(java_structure, db_metadata, cache_size=cache_size)
+    restorer._progress_enabled = False
+    for name, value in settings.items():
+        setattr(restorer, name, value)
+    _WORKER_RESTORER = restorer
+
+
+def _restore_function_in_worker(
+    target: Tuple[int, int],
+) -> Tuple[Optional[FunctionDesign], Dict[str, int], Set[str]]:
+    """ワーカーで 1 クラスを還元し、(結果, 統計の差分, 参照テーブル) を返す"""
+    restorer = _WORKER_RESTORER
+    fi, ci = target
+    file_entry = restorer.java_structure['files'][fi]
+    func_design = restorer._restore_function(file_entry['classes'][ci], file_entry)
+    stats = dict(restorer._stats)
+    unique_tables = restorer._stats_unique_tables
+    restorer._stats.clear()
+    restorer._stats_unique_tables = set()
+    return func_design, stats, unique_tables
+
+
 # ---------- 出力フォーマット ----------
 
+def _write_json_file(path: Path, obj: Any) -> None:
+    """インデント 2 の UTF-8 JSON として保存（全体を str に展開せずに書き出す）"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with path.open('w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+
 def format_design_document(design: SystemDesign) -> Dict[str, Any]:
     """設計ドキュメントをフォーマット"""
     
     # 機能一覧
-    function_list = []
-    for func in design.functions:
-        function_list.append({
+    functions = design.functions
+    function_list: List[Dict[str, Any]] = [
+        {
             'id': func.function_id,
             'name': func.function_name,
             'type': func.function_type,
@@ -911,15 +1461,18 @@ def format_design_document(design: SystemDesign) -> Dict[str, Any]:
             ],
             'crud_matrix': func.crud_matrix,
             'related_classes': func.related_classes,
-        })
+        }
+        for func in functions
+    ]
     
-    # 統計情報
+    # 統計情報（機能種別ごとの件数は Counter の 1 パスで数える）
+    type_counts = Counter(func.function_type for func in functions)
     stats = {
-        'total_functions': len(design.functions),
-        'screen_functions': len([f for f in design.functions if f.function_type == 'screen']),
-        'batch_functions': len([f for f in design.functions if f.function_type == 'batch']),
-        'total_tables': len(design.er_diagram_data.get('tables', [])),
-        'total_relationships': len(design.er_diagram_data.get('relationships', [])),
+        'total_functions': len(functions),
+        'screen_functions': type_counts['screen'],
+        'batch_functions': type_counts['batch'],
+        'total_tables': len(design.er_diagram_data.get('tables', ())),
+        'total_relationships': len(design.er_diagram_data.get('relationships', ())),
     }
     
     return {
@@ -949,8 +1502,16 @@ def print_design_summary(design_doc: Dict[str, Any]):
     
     print(f"\n【機能一覧】")
     
+    # 画面機能・バッチ機能を 1 パスで振り分ける
+    screen_funcs = []
+    batch_funcs = []
+    for f in functions:
+        if f['type'] == 'screen':
+            screen_funcs.append(f)
+        elif f['type'] == 'batch':
+            batch_funcs.append(f)
+    
     # 画面機能
-    screen_funcs = [f for f in functions if f['type'] == 'screen']
     if screen_funcs:
         print(f"\n  ■ 画面機能 ({len(screen_funcs)}件)")
         for func in screen_funcs[:10]:
@@ -960,7 +1521,6 @@ def print_design_summary(design_doc: Dict[str, Any]):
             print(f"      テーブル: {tables}")
     
     # バッチ機能
-    batch_funcs = [f for f in functions if f['type'] == 'batch']
     if batch_funcs:
         print(f"\n  ■ バッチ機能 ({len(batch_funcs)}件)")
         for func in batch_funcs[:10]:
@@ -973,9 +1533,13 @@ def print_design_summary(design_doc: Dict[str, Any]):
     matrix = design_doc.get('table_function_matrix', {})
     if matrix:
         print(f"\n【テーブル-機能マトリックス】(主要テーブル)")
-        for table_name, func_ids in list(matrix.items())[:10]:
-            er_tables = {t['name']: t for t in design_doc.get('er_diagram', {}).get('tables', [])}
-            logical_name = er_tables.get(table_name, {}).get('logical_name', table_name)
+        # 物理名 → 論理名（ループ内で空 dict を作って .get を重ねない）
+        logical_names = {
+            t['name']: t.get('logical_name', t['name'])
+            for t in design_doc.get('er_diagram', {}).get('tables', ())
+        }
+        for table_name, func_ids in islice(matrix.items(), 10):
+            logical_name = logical_names.get(table_name, table_name)
             print(f"    · {logical_name} ({table_name})")
             print(f"      使用機能: {len(func_ids)}件")
     
@@ -997,6 +1561,11 @@ def main():
                         help="コールグラフ追跡の最大深さ (default: 8)")
     parser.add_argument("--call-nodes", type=int, default=800,
                         help="コールグラフ追跡の最大ノード数 (default: 800)")
+    parser.add_argument("--cache-size", type=int, default=FunctionDesignRestorer.DEFAULT_CACHE_SIZE,
+                        help="メソッド単位キャッシュの最大件数。0 以下で無制限 "
+                             f"(default: {FunctionDesignRestorer.DEFAULT_CACHE_SIZE})")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="クラス解析の並列プロセス数 (default: 1 = 逐次。2 以上ではコールグラフ進捗ログを省略)")
 
     # progress logs
     parser.add_argument("--progress", action="store_true",
@@ -1020,13 +1589,10 @@ def main():
         raise SystemExit(f"DBメタデータファイルが存在しません: {db_path}")
     
     print(f"[情報] Java構造を読み込み中: {java_path}")
-    java_structure = json.loads(java_path.read_text(encoding='utf-8'))
-    
     print(f"[情報] DBメタデータを読み込み中: {db_path}")
-    db_metadata = json.loads(db_path.read_text(encoding='utf-8'))
+    restorer = FunctionDesignRestorer.from_paths(java_path, db_path, cache_size=args.cache_size)
     
     print(f"[情報] 機能設計を還元中...")
-    restorer = FunctionDesignRestorer(java_structure, db_metadata)
     # progress settings
     restorer._progress_enabled = bool(args.progress or (not args.quiet))
     restorer._progress_class_every = max(1, int(args.progress_every_classes))
@@ -1036,14 +1602,12 @@ def main():
     # Override traversal limits from CLI
     restorer._call_max_depth = max(0, int(args.call_depth))
     restorer._call_max_nodes = max(1, int(args.call_nodes))
+    restorer._jobs = max(1, int(args.jobs))
     design = restorer.restore_design()
     
     design_doc = format_design_document(design)
     
-    output_path.write_text(
-        json.dumps(design_doc, ensure_ascii=False, indent=2),
-        encoding='utf-8'
-    )
+    _write_json_file(output_path, design_doc)
     
     if not args.quiet:
         print_design_summary(design_doc)
@@ -21,19 +21,35 @@ import json
 import re
 import time
 from pathlib import Path
-from typing import Dict, List, Any, Set, Tuple, Optional
-from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Any, Set, FrozenSet, Iterator, Tuple, Optional
+from dataclasses import dataclass, field, asdict, replace
 from collections import defaultdict, deque
+from functools import lru_cache
+
+# Optional deps
+try:
+    import ijson  # type: ignore  # 大きな java_structure.json のストリーム読み込み用
+except Exception:
+    ijson = None
+
+try:
+    import orjson  # type: ignore  # 高速な JSON 読み書き（未インストールなら標準 json）
+except Exception:
+    orjson = None
+
 # ---------- 呼び出し関係（コールグラフ） ----------
 
-_IGNORE_METHOD_NAMES = {
+_IGNORE_METHOD_NAMES = frozenset({
     # Java/common noise
     'toString', 'equals', 'hashCode', 'getClass', 'clone', 'finalize',
     # collections
     'size', 'isEmpty', 'add', 'put', 'remove', 'contains', 'containsKey',
     # typical fluent methods
     'append', 'format', 'valueOf',
-}
+})
+
+_NEW_EXPR_RE = re.compile(r"\bnew\s+([A-Za-z_][A-Za-z0-9_]*)\b")
+_NON_IDENT_CHAR_RE = re.compile(r"[^A-Za-z0-9_]")
 
 
 def _simplify_qualifier(text: Optional[str]) -> Optional[str]:
@@ -53,7 +69,7 @@ def _simplify_qualifier(text: Optional[str]) -> Optional[str]:
         return None
 
     # "new Type(...)" -> Type
-    m = re.search(r"\bnew\s+([A-Za-z_][A-Za-z0-9_]*)\b", q)
+    m = _NEW_EXPR_RE.search(q)
     if m:
         return m.group(1)
 
@@ -63,7 +79,7 @@ def _simplify_qualifier(text: Optional[str]) -> Optional[str]:
     if '.' in q:
         q = q.rsplit('.', 1)[-1].strip()
     # Keep only identifier-like token
-    q = re.sub(r"[^A-Za-z0-9_]", "", q)
+    q = _NON_IDENT_CHAR_RE.sub("", q)
     return q or None
 
 
@@ -71,15 +87,40 @@ def _looks_like_class_name(name: str) -> bool:
     return bool(name) and name[0].isupper()
 
 
-def _extract_used_columns(text: str, columns: List[Dict[str, Any]], max_cols: int = 25) -> List[Dict[str, Any]]:
+@lru_cache(maxsize=4096)
+def _column_word_re(name: str) -> re.Pattern:
+    """カラム名 → 単語境界つきの大小無視パターン（上限付きで使い回す）"""
+    return re.compile(rf"\b{re.escape(name)}\b", re.IGNORECASE)
+
+
+_WORD_RE = re.compile(r"\w+")
+_ASCII_WORD_RE = re.compile(r"[A-Za-z0-9_]+")
+
+
+def _text_words(text: str) -> Optional[Set[str]]:
+    """Lowered words (maximal `\w+` runs) of an ASCII text; None for non-ASCII text.
+
+    For ASCII text and an ASCII identifier-like name, `\b{name}\b` (IGNORECASE) matches
+    exactly when the name is one of these words, so one scan answers every column.
+    """
+    if not text.isascii():
+        return None
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def _extract_used_columns(text: str, columns: List[Dict[str, Any]], max_cols: int = 25,
+                          words: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
     """Extract likely-used column names by scanning the SQL/code text.
 
     This is a heuristic (static analysis) and may over/under-approximate.
+    `words` is `_text_words(text)`; pass it when checking several tables against the same text.
     """
     used: List[Dict[str, Any]] = []
     if not text:
         return used
-    # Lower for case-insensitive contains; regex is still used for word boundary
+    if words is None:
+        words = _text_words(text)
+    # ASCII names are looked up in the word set; other names (or non-ASCII text) use a regex
     for col in columns:
         name = (col.get('name') or '').strip()
         if not name:
@@ -87,19 +128,55 @@ def _extract_used_columns(text: str, columns: List[Dict[str, Any]], max_cols: in
         # Avoid extremely short tokens that create many false positives
         if len(name) <= 2:
             continue
-        try:
-            if re.search(rf"\b{re.escape(name)}\b", text, flags=re.IGNORECASE):
-                used.append({
-                    'name': name,
-                    'logical_name': col.get('logical_name'),
-                })
-        except re.error:
-            continue
+        if words is not None and _ASCII_WORD_RE.fullmatch(name):
+            hit = name.lower() in words
+        else:
+            hit = _column_word_re(name).search(text) is not None
+        if hit:
+            used.append({
+                'name': name,
+                'logical_name': col.get('logical_name'),
+            })
         if len(used) >= max_cols:
             break
     return used
 
 
+class _LRUCache:
+    """Bounded mapping that evicts the least recently used entry (maxsize <= 0: unbounded).
+
+    Relies on dict insertion order: a hit re-inserts the key at the end, eviction drops the first key.
+    """
+
+    __slots__ = ('maxsize', '_data')
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: Dict[Any, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._data
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        data = self._data
+        try:
+            value = data.pop(key)
+        except KeyError:
+            return default
+        data[key] = value
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        data = self._data
+        data.pop(key, None)
+        data[key] = value
+        if 0 < self.maxsize < len(data):
+            del data[next(iter(data))]
+
+
 # ---------- データ構造 ----------
 
 @dataclass
@@ -138,6 +215,76 @@ class SystemDesign:
 
 # ---------- SQL/テーブル参照抽出 ----------
 
+# テーブル名として扱わない予約語・一般的な変数名（大文字）
+_SQL_RESERVED = frozenset({
+    'SELECT', 'FROM', 'WHERE', 'AND', 'OR', 'SET', 'INTO',
+    'VALUES', 'ORDER', 'GROUP', 'HAVING', 'LIMIT', 'OFFSET',
+    'NULL', 'TRUE', 'FALSE', 'AS', 'ON', 'IN', 'NOT', 'LIKE',
+})
+
+
+def _strip_inline_ignorecase(pattern: str) -> str:
+    """先頭の ``(?i)`` を取り除く（_FusedPatterns は IGNORECASE でコンパイルするため不要）"""
+    return pattern[len('(?i)'):] if pattern.startswith('(?i)') else pattern
+
+
+class _FusedPatterns:
+    """複数の正規表現を 1 回の走査で評価する結合パターン.
+
+    全パターンを 1 つの先読み ``(?=(?:(?P<a>...)|(?P<b>...)|...))`` にまとめて finditer し、
+    一致したパターン（lastindex）で振り分ける。先読みなので一致箇所を消費せず、
+    「DELETE FROM t」の FROM のように別位置から始まる重複一致も検出できる。
+    同一位置で後続パターンも一致しうる場合（例: FROM "S"."T" は FROM と引用符付き FROM の両方に一致）は、
+    一致位置でのみ後続パターンを個別に match して補う。
+
+    パターン毎に直前に採用した一致の終端より前から始まる一致は捨てるので、
+    結果は各パターンを個別に re.finditer した場合と同じになる
+    （例: 「UPDATE UPDATE t」の 2 つ目の UPDATE や sdt_sdt_x の 2 つ目の sdt_ は拾わない）。
+    パターンは IGNORECASE でコンパイルする。
+    guard には全パターンの一致開始位置が必ず満たす条件（例: ``\\b(?=[fj])``）を指定でき、
+    先読みの評価を候補位置に絞る（結果は変わらない）。
+    """
+
+    __slots__ = ('names', 'fused', '_alternatives', '_by_lastindex')
+
+    def __init__(self, named_patterns: List[Tuple[str, str]], guard: str = ''):
+        self.names = [name for name, _ in named_patterns]
+        self.fused = re.compile(
+            guard + '(?=(?:' + '|'.join(f"(?P<{name}>{pattern})" for name, pattern in named_patterns) + '))',
+            re.IGNORECASE,
+        )
+        # (結合パターン内でのパターン全体のグループ番号, キャプチャグループ数, 個別コンパイル済みパターン)
+        self._alternatives: List[Tuple[int, int, re.Pattern]] = []
+        for name, pattern in named_patterns:
+            single = re.compile(pattern, re.IGNORECASE)
+            self._alternatives.append((self.fused.groupindex[name], single.groups, single))
+        self._by_lastindex = {self.fused.groupindex[name]: k for k, name in enumerate(self.names)}
+
+    def search(self, code: str) -> bool:
+        """いずれかのパターンが一致するか"""
+        return self.fused.search(code) is not None
+
+    def scan(self, code: str) -> Iterator[Tuple[int, Tuple[str, ...], int]]:
+        """(パターン番号, キャプチャグループの文字列のタプル, 一致開始位置) を出現位置順に列挙する"""
+        alternatives = self._alternatives
+        count = len(alternatives)
+        ends = [0] * count  # パターン毎の直前の採用一致の終端（個別 finditer の再開位置）
+        for m in self.fused.finditer(code):
+            pos = m.start()
+            k = self._by_lastindex[m.lastindex]
+            base, ngroups, _ = alternatives[k]
+            if pos >= ends[k]:
+                ends[k] = m.end(base)
+                yield k, m.groups()[base:base + ngroups], pos
+            for j in range(k + 1, count):
+                if pos < ends[j]:
+                    continue
+                m2 = alternatives[j][2].match(code, pos)
+                if m2:
+                    ends[j] = m2.end()
+                    yield j, m2.groups(), pos
+
+
 class TableReferenceExtractor:
     """コードからテーブル参照を抽出"""
     
@@ -206,26 +353,69 @@ class TableReferenceExtractor:
         # Generic SQL keywords (fallback; may be noisy but useful when literals are concatenated)
         'SQL_KEYWORD': r'(?i)\b(select|insert\s+into|update|delete\s+from)\b',
     }
+
+    # GeneXusパターン → 操作種別
+    GENEXUS_OPERATIONS = {
+        'BC_LOAD': 'SELECT',
+        'BC_SAVE': 'INSERT/UPDATE',
+        'BC_DELETE': 'DELETE',
+        'FOR_EACH': 'SELECT',
+        'SDT_REF': 'REFERENCE',
+    }
+
+    # 上記パターンを用途毎に結合した単一パターン（クラス定義時に 1 回だけコンパイルし、全インスタンスで共有）
+    # SQL + 引用符付き schema.table: 全パターンは \b + FROM/JOIN/INNER/LEFT/RIGHT/INSERT/UPDATE/DELETE で始まる
+    _SQL_RE = _FusedPatterns(
+        [
+            (f"{op_type}_{i}", _strip_inline_ignorecase(pattern))
+            for op_type, patterns in SQL_PATTERNS.items()
+            for i, pattern in enumerate(patterns)
+        ] + [
+            (f"QUOTED_{op_type}_{i}", _strip_inline_ignorecase(pattern))
+            for op_type, patterns in SQL_QUOTED_PATTERNS.items()
+            for i, pattern in enumerate(patterns)
+        ],
+        guard=r'\b(?=[fijlrud])',
+    )
+    # パターン番号 → (操作種別, テーブル名のグループの groups 内の位置)。引用符付きは groups=(schema, table)
+    _SQL_KINDS = (
+        [(op_type, 0) for op_type, patterns in SQL_PATTERNS.items() for _ in patterns]
+        + [(op_type, 1) for op_type, patterns in SQL_QUOTED_PATTERNS.items() for _ in patterns]
+    )
+    # has_db_hints 用: GeneXus パターン + DB_HINT_PATTERNS（全パターンは単語文字から始まる）
+    _HINT_RE = _FusedPatterns(
+        [(name, _strip_inline_ignorecase(pattern)) for name, pattern in GENEXUS_PATTERNS.items()]
+        + [(name, _strip_inline_ignorecase(pattern)) for name, pattern in DB_HINT_PATTERNS.items()],
+        guard=r'(?=\w)',
+    )
+    # _HINT_RE のどのパターンも、一致するには（小文字化した）テキストが次のいずれかを含む必要がある
+    # （select / insert into / execute( / prepareStatement / GxDataStore / x_bc.load / for each ...）
+    _HINT_LITERALS = (
+        'select', 'update', 'insert', 'delete', 'execute', '_bc', 'sdt_', 'each', 'pr_default',
+        'cursor', 'open', 'close', 'fetch', 'datastore', 'gxcontext', 'statement', 'resultset',
+    )
+    # GeneXus 抽出と debug_scan_db_hints は個別パターンのまま走査する。
+    # (\w+)_bc は全位置が一致候補になり guard で絞れないため、結合すると個別の finditer より遅い。
+    # debug_scan_db_hints は max_items 件で打ち切れる個別走査の方が速い。
+    _GENEXUS_PATTERNS_C = {name: re.compile(p) for name, p in GENEXUS_PATTERNS.items()}
+    _DB_HINT_PATTERNS_C = {name: re.compile(p) for name, p in DB_HINT_PATTERNS.items()}
     
     def __init__(self, db_metadata: Dict[str, Any]):
         self.db_metadata = db_metadata
         self.table_names = self._build_table_name_set()
         self.table_logical_names = self._build_logical_name_map()
     
-    def _build_table_name_set(self) -> Set[str]:
-        """テーブル名セットを構築"""
-        tables = set()
-        for table in self.db_metadata.get('tables', []):
-            tables.add(table['table_name'].upper())
-            tables.add(table['table_name'].lower())
-        return tables
+    def _build_table_name_set(self) -> FrozenSet[str]:
+        """テーブル名セットを構築（大文字に正規化し、照合側も upper() の 1 回で済ませる）"""
+        return frozenset(
+            table['table_name'].upper() for table in self.db_metadata.get('tables', [])
+        )
     
     def _build_logical_name_map(self) -> Dict[str, str]:
-        """テーブル物理名 → 論理名 マッピング"""
+        """テーブル物理名（大文字） → 論理名 マッピング"""
         mapping = {}
         for table in self.db_metadata.get('tables', []):
             mapping[table['table_name'].upper()] = table.get('logical_name', table['table_name'])
-            mapping[table['table_name'].lower()] = table.get('logical_name', table['table_name'])
         return mapping
     
     def extract_from_code(self, code: str, class_name: str, 
@@ -233,64 +423,45 @@ class TableReferenceExtractor:
         """コードからテーブル参照を抽出"""
         references = []
         
-        # SQL文からのテーブル抽出
-        for op_type, patterns in self.SQL_PATTERNS.items():
-            for pattern in patterns:
-                for match in re.finditer(pattern, code):
-                    raw = match.group(1)
-                    table_name = self._normalize_table_token(raw)
-                    if table_name and self._is_valid_table(table_name):
-                        references.append(TableReference(
-                            table_name=table_name,
-                            logical_name=self._get_logical_name(table_name),
-                            operation_type=op_type,
-                            source_class=class_name,
-                            source_method=method_name,
-                            context=self._extract_context(code, match.start()),
-                        ))
-
-        # Quoted schema.table patterns
-        for op_type, patterns in self.SQL_QUOTED_PATTERNS.items():
-            for pattern in patterns:
-                for match in re.finditer(pattern, code):
-                    # group(1)=schema, group(2)=table
-                    raw = match.group(2)
-                    table_name = self._normalize_table_token(raw)
-                    if table_name and self._is_valid_table(table_name):
-                        references.append(TableReference(
-                            table_name=table_name,
-                            logical_name=self._get_logical_name(table_name),
-                            operation_type=op_type,
-                            source_class=class_name,
-                            source_method=method_name,
-                            context=self._extract_context(code, match.start()),
-                        ))
+        # SQL文（引用符付き schema.table を含む）からのテーブル抽出: 1 回の走査で全パターンを評価
+        for (op_type, group), hits in zip(self._SQL_KINDS, self._scan_sql(code)):
+            for groups, pos in hits:
+                table_name = self._normalize_table_token(groups[group])
+                if table_name and self._is_valid_table(table_name):
+                    references.append(TableReference(
+                        table_name=table_name,
+                        logical_name=self._get_logical_name(table_name),
+                        operation_type=op_type,
+                        source_class=class_name,
+                        source_method=method_name,
+                        context=self._extract_context(code, pos),
+                    ))
         
         # GeneXus特有パターンからの抽出
         references.extend(self._extract_genexus_references(code, class_name, method_name))
         
         return references
     
+    def _scan_sql(self, code: str) -> List[List[Tuple[Tuple[str, ...], int]]]:
+        """SQL パターン毎の [(キャプチャグループ, 一致開始位置), ...]（パターン定義順 → 出現位置順）"""
+        hits: List[List[Tuple[Tuple[str, ...], int]]] = [[] for _ in self._SQL_KINDS]
+        for k, groups, pos in self._SQL_RE.scan(code):
+            hits[k].append((groups, pos))
+        return hits
+    
     def _extract_genexus_references(self, code: str, class_name: str,
                                     method_name: Optional[str]) -> List[TableReference]:
         """GeneXus特有のテーブル参照を抽出"""
         references = []
         
         # Business Component参照
-        for pattern_name, pattern in self.GENEXUS_PATTERNS.items():
-            for match in re.finditer(pattern, code):
+        for pattern_name, pattern in self._GENEXUS_PATTERNS_C.items():
+            op_type = self.GENEXUS_OPERATIONS.get(pattern_name, 'UNKNOWN')
+            for match in pattern.finditer(code):
                 entity_name = match.group(1)
                 table_name = self._guess_table_from_entity(entity_name)
                 
                 if table_name:
-                    op_type = {
-                        'BC_LOAD': 'SELECT',
-                        'BC_SAVE': 'INSERT/UPDATE',
-                        'BC_DELETE': 'DELETE',
-                        'FOR_EACH': 'SELECT',
-                        'SDT_REF': 'REFERENCE',
-                    }.get(pattern_name, 'UNKNOWN')
-                    
                     references.append(TableReference(
                         table_name=table_name,
                         logical_name=self._get_logical_name(table_name),
@@ -304,15 +475,13 @@ class TableReferenceExtractor:
     
     def _is_valid_table(self, name: str) -> bool:
         """有効なテーブル名かチェック"""
-        # 予約語や一般的な変数名を除外
-        exclude = {'SELECT', 'FROM', 'WHERE', 'AND', 'OR', 'SET', 'INTO', 
-                   'VALUES', 'ORDER', 'GROUP', 'HAVING', 'LIMIT', 'OFFSET',
-                   'NULL', 'TRUE', 'FALSE', 'AS', 'ON', 'IN', 'NOT', 'LIKE'}
         if not name:
             return False
-        if name.upper() in exclude:
+        upper = name.upper()
+        # 予約語や一般的な変数名を除外
+        if upper in _SQL_RESERVED:
             return False
-        return name.upper() in self.table_names or name.lower() in self.table_names
+        return upper in self.table_names
 
     def _normalize_table_token(self, token: str) -> str:
         """Normalize a matched table token to a physical table name.
@@ -332,7 +501,7 @@ class TableReferenceExtractor:
         if '.' in t:
             t = t.split('.')[-1]
         # keep identifier chars
-        t = re.sub(r"[^A-Za-z0-9_]", "", t)
+        t = _NON_IDENT_CHAR_RE.sub("", t)
         return t
 
     def debug_scan_sql_candidates(self, code: str) -> List[Dict[str, Any]]:
@@ -344,28 +513,22 @@ class TableReferenceExtractor:
         out: List[Dict[str, Any]] = []
         if not code:
             return out
-        for op_type, patterns in self.SQL_PATTERNS.items():
-            for pattern in patterns:
-                for match in re.finditer(pattern, code):
-                    raw = match.group(1)
+        for (op_type, group), hits in zip(self._SQL_KINDS, self._scan_sql(code)):
+            for groups, _ in hits:
+                if group == 0:
+                    raw = groups[0]
                     norm = self._normalize_table_token(raw)
                     if not norm:
                         out.append({'op_type': op_type, 'raw_token': raw, 'normalized': norm, 'is_valid': False, 'reason': 'normalize_empty'})
                         continue
-                    if self._is_valid_table(norm):
-                        out.append({'op_type': op_type, 'raw_token': raw, 'normalized': norm, 'is_valid': True, 'reason': 'ok'})
-                    else:
-                        out.append({'op_type': op_type, 'raw_token': raw, 'normalized': norm, 'is_valid': False, 'reason': 'not_in_db_metadata'})
-
-        for op_type, patterns in self.SQL_QUOTED_PATTERNS.items():
-            for pattern in patterns:
-                for match in re.finditer(pattern, code):
-                    raw = match.group(2)
-                    norm = self._normalize_table_token(raw)
-                    if self._is_valid_table(norm):
-                        out.append({'op_type': op_type, 'raw_token': f"{match.group(1)}.{raw}", 'normalized': norm, 'is_valid': True, 'reason': 'ok'})
-                    else:
-                        out.append({'op_type': op_type, 'raw_token': f"{match.group(1)}.{raw}", 'normalized': norm, 'is_valid': False, 'reason': 'not_in_db_metadata'})
+                else:
+                    # quoted schema.table: groups=(schema, table)
+                    raw = f"{groups[0]}.{groups[1]}"
+                    norm = self._normalize_table_token(groups[1])
+                if self._is_valid_table(norm):
+                    out.append({'op_type': op_type, 'raw_token': raw, 'normalized': norm, 'is_valid': True, 'reason': 'ok'})
+                else:
+                    out.append({'op_type': op_type, 'raw_token': raw, 'normalized': norm, 'is_valid': False, 'reason': 'not_in_db_metadata'})
         return out
 
     def has_db_hints(self, code: str) -> bool:
@@ -378,14 +541,14 @@ class TableReferenceExtractor:
         """
         if not code:
             return False
-        # Fast path: check GeneXus patterns too
-        for _, pat in self.GENEXUS_PATTERNS.items():
-            if re.search(pat, code):
-                return True
-        for _, pat in self.DB_HINT_PATTERNS.items():
-            if re.search(pat, code):
-                return True
-        return False
+        # Cheap prescreen: without any hint literal no pattern can match. Only for ASCII text,
+        # where lower() agrees with the patterns' IGNORECASE matching.
+        if code.isascii():
+            lowered = code.lower()
+            if not any(literal in lowered for literal in self._HINT_LITERALS):
+                return False
+        # GeneXus patterns + DB hint patterns in a single search
+        return self._HINT_RE.search(code)
 
     def debug_scan_db_hints(self, code: str, max_items: int = 12) -> List[Dict[str, Any]]:
         """Debug helper: scan DB hint patterns and report hits."""
@@ -394,8 +557,8 @@ class TableReferenceExtractor:
             return out
 
         # 1) GeneXus patterns
-        for name, pat in self.GENEXUS_PATTERNS.items():
-            for m in re.finditer(pat, code):
+        for name, pat in self._GENEXUS_PATTERNS_C.items():
+            for m in pat.finditer(code):
                 out.append({
                     'hint_type': f"GENEXUS:{name}",
                     'match': (m.group(0) or '')[:120],
@@ -404,8 +567,8 @@ class TableReferenceExtractor:
                     return out
 
         # 2) Generic DB hint patterns
-        for name, pat in self.DB_HINT_PATTERNS.items():
-            for m in re.finditer(pat, code):
+        for name, pat in self._DB_HINT_PATTERNS_C.items():
+            for m in pat.finditer(code):
                 out.append({
                     'hint_type': name,
                     'match': (m.group(0) or '')[:120],
@@ -416,37 +579,110 @@ class TableReferenceExtractor:
     
     def _get_logical_name(self, table_name: str) -> str:
         """テーブルの論理名を取得"""
-        return self.table_logical_names.get(table_name.upper(), 
-               self.table_logical_names.get(table_name.lower(), table_name))
+        return self.table_logical_names.get(table_name.upper(), table_name)
     
     def _guess_table_from_entity(self, entity_name: str) -> Optional[str]:
         """エンティティ名からテーブル名を推測"""
-        # 直接マッチ
-        if entity_name.upper() in self.table_names:
-            return entity_name.upper()
-        if entity_name.lower() in self.table_names:
-            return entity_name.lower()
+        # 直接マッチ（table_names は大文字のみ）
+        upper = entity_name.upper()
+        if upper in self.table_names:
+            return upper
         
         # プレフィックス除去してマッチ
-        for prefix in ['sdt_', 'type_', 'bc_', 'trn_']:
-            if entity_name.lower().startswith(prefix):
-                base_name = entity_name[len(prefix):]
-                if base_name.upper() in self.table_names:
-                    return base_name.upper()
+        lowered = entity_name.lower()
+        for prefix in ('sdt_', 'type_', 'bc_', 'trn_'):
+            if lowered.startswith(prefix):
+                base_name = entity_name[len(prefix):].upper()
+                if base_name in self.table_names:
+                    return base_name
         
         return None
     
     def _extract_context(self, code: str, position: int, context_length: int = 100) -> str:
         """参照箇所の前後コンテキストを抽出"""
-        start = max(0, position - context_length // 2)
-        end = min(len(code), position + context_length // 2)
-        return code[start:end].replace('\n', ' ').strip()
+        # スライス終端は len(code) で自動的に切り詰められるため min() は不要。
+        # str.replace + strip は 1 文字置換なら translate より大幅に速い。
+        half = context_length // 2
+        start = position - half
+        if start < 0:
+            start = 0
+        return code[start:position + half].replace('\n', ' ').strip()
+
+
+# ---------- 入力読み込み ----------
+
+# java_structure で保持するキー（imports / annotations など解析に使わないものは読み捨てる）
+_JAVA_FILE_KEYS = ('path', 'file_path', 'relative_path', 'name', 'file')
+_JAVA_CLASS_KEYS = ('name', 'full_name', 'package', 'function_type', 'genexus_type')
+_JAVA_METHOD_KEYS = ('name', 'param_count', 'start_line', 'code', 'signature', 'sql_strings', 'calls', 'has_db_hints')
+
+
+def _slim_file_entry(file_entry: Dict[str, Any]) -> Dict[str, Any]:
+    """ファイルエントリから解析に使うキーだけを残したコピーを作る"""
+    classes = []
+    for cls in file_entry.get('classes', []) or []:
+        slim_cls = {key: cls[key] for key in _JAVA_CLASS_KEYS if key in cls}
+        type_refs = (cls.get('dependencies') or {}).get('type_references')
+        if type_refs:
+            slim_cls['dependencies'] = {'type_references': type_refs}
+        slim_cls['methods'] = [
+            {key: m[key] for key in _JAVA_METHOD_KEYS if key in m}
+            for m in cls.get('methods', []) or []
+        ]
+        classes.append(slim_cls)
+    slim_entry = {key: file_entry[key] for key in _JAVA_FILE_KEYS if key in file_entry}
+    slim_entry['classes'] = classes
+    return slim_entry
+
+
+def _load_json_file(path: Path) -> Any:
+    """JSONファイルを読み込む（str へのデコードを挟まずバイト列のまま解析）"""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with path.open('rb') as f:
+        return json.load(f)  # UTF-8 のバイト列を直接受け付ける
+
+
+def _load_java_structure(path: Path) -> Dict[str, Any]:
+    """Java構造JSONを読み込む
+
+    ijson がインストールされていれば files を 1 件ずつストリーム処理し、
+    ファイル全体の辞書をメモリに展開しない。索引は restore_design でも使う files の一覧から
+    構築するので、解析に使うキーだけに絞った files 全体は保持する（索引の逐次構築はしない）。
+    """
+    if ijson is None:
+        structure = _load_json_file(path)
+        structure['files'] = [_slim_file_entry(fe) for fe in structure.get('files', []) or []]
+        return structure
+
+    structure: Dict[str, Any] = {}
+
+    def events(f):
+        # files 以外で参照するのは project_root と call_graph の上限値のみ（スカラーなので通過するイベントから拾う）
+        for prefix, event, value in ijson.parse(f):
+            if prefix == 'project_root' and event == 'string':
+                structure['project_root'] = value
+            elif prefix in ('call_graph.max_depth', 'call_graph.max_nodes') and event == 'number':
+                structure.setdefault('call_graph', {})[prefix[len('call_graph.'):]] = value
+            yield prefix, event, value
+
+    # 1 回の走査で files を 1 件ずつ組み立てつつスカラーも拾う（items はイベント列を最後まで読む）
+    with path.open('rb') as f:
+        structure['files'] = [_slim_file_entry(fe) for fe in ijson.items(events(f), 'files.item')]
+    return structure
 
 
 # ---------- 機能設計還元 ----------
 
+# クラス名の先頭単語（例: "OrderEdit" -> "Order"）。_extract_prefix 用
+_PREFIX_RE = re.compile(r'^([A-Z]?[a-z]+)')
+
+
 class FunctionDesignRestorer:
     """機能設計を還元"""
+
+    # 同一コード本文の抽出結果キャッシュの上限件数（超過時は最も古く使われたものから破棄）
+    TEXT_CACHE_SIZE = 4096
     
     def __init__(self, java_structure: Dict[str, Any], db_metadata: Dict[str, Any]):
         self.java_structure = java_structure
@@ -461,6 +697,9 @@ class FunctionDesignRestorer:
         self._class_name_to_fulls, self._class_full_to_method_ids, self._methods_by_class, self._methods_by_name = self._build_fast_call_indexes()
         self._method_refs_cache: Dict[str, List[TableReference]] = {}
         self._method_columns_cache: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        # code text -> (refs, used columns per table) of a method with that text (LRU, TEXT_CACHE_SIZE entries).
+        # Generated GeneXus code repeats identical bodies across classes; those are extracted once.
+        self._text_extract_cache = _LRUCache(self.TEXT_CACHE_SIZE)
 
         # ---- progress / stats ----
         # You can override these from CLI (see main) or by setting attributes directly.
@@ -516,12 +755,35 @@ class FunctionDesignRestorer:
             print(msg)
             self._progress_last_ts = now
 
+    def _extract_for_method(self, text: str, src_class: str,
+                            src_method: Optional[str]) -> Tuple[List[TableReference], Dict[str, List[Dict[str, Any]]]]:
+        """Extract table refs and used columns (keyed by upper table name) from one method body.
+
+        Results are shared between methods with the same text; only the source class/method
+        of the references differ, so cached references are copied with those replaced.
+        """
+        cached = self._text_extract_cache.get(text)
+        if cached is not None:
+            refs, cols_map = cached
+            return [replace(r, source_class=src_class, source_method=src_method) for r in refs], cols_map
+
+        refs = self.extractor.extract_from_code(text, src_class, src_method)
+        cols_map: Dict[str, List[Dict[str, Any]]] = {}
+        words = _text_words(text) if refs else None  # 1 回の走査で全テーブルのカラム判定に使う
+        for r in refs:
+            tinfo = self.table_info.get(r.table_name.upper(), {})
+            cols = tinfo.get('columns', [])
+            cols_used = _extract_used_columns(text, cols, words=words)
+            if cols_used:
+                cols_map[r.table_name.upper()] = cols_used
+        self._text_extract_cache[text] = (refs, cols_map)
+        return refs, cols_map
+
     def _build_table_info(self) -> Dict[str, Dict[str, Any]]:
         """テーブル情報辞書を構築"""
         info = {}
         for table in self.db_metadata.get('tables', []):
             info[table['table_name'].upper()] = table
-            info[table['table_name'].lower()] = table
         return info
 
     def _build_call_graph_indexes(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
@@ -803,14 +1065,10 @@ class FunctionDesignRestorer:
                 sql_strings = m.get('sql_strings') or []
                 if sql_strings:
                     method_code = method_code + "\n" + "\n".join(sql_strings)
-                refs = self.extractor.extract_from_code(method_code, class_name, m.get('name'))
+                refs, cols_map = self._extract_for_method(method_code, class_name, m.get('name'))
                 all_references.extend(refs)
-                for r in refs:
-                    tinfo = self.table_info.get(r.table_name.upper(), {})
-                    cols = tinfo.get('columns', [])
-                    cols_used = _extract_used_columns(method_code, cols)
-                    if cols_used:
-                        columns_used_map[r.table_name.upper()] = cols_used
+                for t, cols_used in cols_map.items():
+                    columns_used_map[t] = cols_used
             return all_references, columns_used_map, set(), debug_info
 
         # Heuristic: start from "interesting" entry methods to avoid exploding the traversal.
@@ -903,14 +1161,7 @@ class FunctionDesignRestorer:
                 cache_hits += 1
                 self._stats['cache_hits'] = self._stats.get('cache_hits', 0) + 1
             else:
-                refs = self.extractor.extract_from_code(text, src_class, src_method)
-                cols_map: Dict[str, List[Dict[str, Any]]] = {}
-                for r in refs:
-                    tinfo = self.table_info.get(r.table_name.upper(), {})
-                    cols = tinfo.get('columns', [])
-                    cols_used = _extract_used_columns(text, cols)
-                    if cols_used:
-                        cols_map[r.table_name.upper()] = cols_used
+                refs, cols_map = self._extract_for_method(text, src_class, src_method)
                 self._method_refs_cache[mid] = refs
                 self._method_columns_cache[mid] = cols_map
 
@@ -1390,7 +1641,7 @@ class FunctionDesignRestorer:
         if '_' in class_name:
             return class_name.split('_')[0].lower()
         
-        match = re.match(r'^([A-Z]?[a-z]+)', class_name)
+        match = _PREFIX_RE.match(class_name)
         if match:
             return match.group(1).lower()
         
@@ -1434,6 +1685,15 @@ class FunctionDesignRestorer:
 
 # ---------- 出力フォーマット ----------
 
+def _write_json_file(path: Path, obj: Any) -> None:
+    """インデント 2 の UTF-8 JSON として保存（全体を str に展開せずに書き出す）"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with path.open('w', encoding='utf-8') as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+
 def format_design_document(design: SystemDesign) -> Dict[str, Any]:
     """設計ドキュメントをフォーマット"""
     
@@ -1579,10 +1839,10 @@ def main():
         raise SystemExit(f"DBメタデータファイルが存在しません: {db_path}")
     
     print(f"[情報] Java構造を読み込み中: {java_path}")
-    java_structure = json.loads(java_path.read_text(encoding='utf-8'))
+    java_structure = _load_java_structure(java_path)
     
     print(f"[情報] DBメタデータを読み込み中: {db_path}")
-    db_metadata = json.loads(db_path.read_text(encoding='utf-8'))
+    db_metadata = _load_json_file(db_path)
     
     print(f"[情報] 機能設計を還元中...")
     restorer = FunctionDesignRestorer(java_structure, db_metadata)
@@ -1608,10 +1868,7 @@ def main():
     
     design_doc = format_design_document(design)
     
-    output_path.write_text(
-        json.dumps(design_doc, ensure_ascii=False, indent=2),
-        encoding='utf-8'
-    )
+    _write_json_file(output_path, design_doc)
     
     if not args.quiet:
         print_design_summary(design_doc)